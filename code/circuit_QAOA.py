@@ -1,4 +1,6 @@
-from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister
+from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister, transpile
+from qiskit.circuit import ParameterVector
+from qiskit.quantum_info import Statevector
 import networkx as nx
 
 
@@ -38,6 +40,33 @@ class QAOA_circuit:
         
         qc.measure(range(nodes), range(nodes))
         return qc
+
+
+class QAOATemplate:
+    """
+    QAOA circuit built once per graph and number of layers with symbolic gamma_l, beta_l,
+    and transpiled once for the backend: an objective call only binds the values and runs.
+    """
+    def __init__(self, graph: nx.Graph, layers: int, backend, builder=None) -> None:
+        self.graph = graph
+        self.layers = layers
+        self.backend = backend
+        self.gamma = ParameterVector("gamma", layers)
+        self.beta = ParameterVector("beta", layers)
+        if builder is None:
+            builder = QAOA_circuit(graph).merged_qaoa_circuit
+        self.circuit = builder(gamma=self.gamma, beta=self.beta)
+        self.transpiled = transpile(self.circuit, backend=backend)
+        self._unmeasured = self.circuit.remove_final_measurements(inplace=False)
+    def bind(self, gamma, beta) -> QuantumCircuit:
+        return self.transpiled.assign_parameters({self.gamma: list(gamma), self.beta: list(beta)})
+    def run(self, gamma, beta, shots: int) -> dict:
+        job = self.backend.run(self.bind(gamma, beta), shots=shots)
+        return job.result().get_counts()
+    def probabilities(self, gamma, beta):
+        """Exact outcome probabilities from the statevector, indexed as qiskit basis states (qubit 0 = bit 0)."""
+        bound = self._unmeasured.assign_parameters({self.gamma: list(gamma), self.beta: list(beta)})
+        return Statevector(bound).probabilities()
     
 
 
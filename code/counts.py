@@ -0,0 +1,106 @@
+import re
+import numpy as np
+import networkx as nx
+from cut_arrays import cut_values
+
+
+_ENTRY = re.compile(r"'([01]+)'\s*:\s*(?:[\w.]*\()?(\d+)")  ### '0101': 12, also Array(12, ...) and np.int64(12)
+
+
+def reverse_bits(indices: np.ndarray, qubits: int) -> np.ndarray:
+    """
+    Reverse the lowest `qubits` bits of every index with the usual mask-and-shift swaps of a 64-bit word.
+    :param indices: (np.ndarray) Basis-state indices;
+    :param qubits: (int) Number of significant bits;
+    :return: (np.ndarray) The uint64 reversed indices.
+    """
+    x = np.asarray(indices, dtype=np.uint64).copy()
+    if qubits == 0:  ### a shift by the full 64-bit width is undefined, and the only index is 0
+        return np.zeros_like(x)
+    for shift, mask in ((1, 0x5555555555555555), (2, 0x3333333333333333), (4, 0x0F0F0F0F0F0F0F0F),
+                        (8, 0x00FF00FF00FF00FF), (16, 0x0000FFFF0000FFFF), (32, 0x00000000FFFFFFFF)):
+        s, m = np.uint64(shift), np.uint64(mask)
+        x = ((x >> s) & m) | ((x & m) << s)
+    return x >> np.uint64(64 - qubits)
+
+
+class Counts:
+    """
+    Measurement counts as two arrays, uint64 basis-state indices and uint32 frequencies, instead of a
+    {bitstring: frequency} dict. Indices follow the PennyLane keys: character i of the bitstring is
+    wire (node) i and wire 0 is the most significant bit. Qiskit keys are the bit-reversed order.
+    """
+    def __init__(self, indices: np.ndarray, freqs: np.ndarray, qubits: int) -> None:
+        self.indices = np.asarray(indices, dtype=np.uint64)
+        self.freqs = np.asarray(freqs, dtype=np.uint32)
+        self.qubits = qubits
+
+    @classmethod
+    def from_dict(cls, counts: dict, qubits: int = None) -> "Counts":
+        """From PennyLane (qml.counts) keys, or any keys where character i is node i."""
+        keys = list(counts)
+        if qubits is None:
+            qubits = len(keys[0]) if keys else 0
+        indices = np.fromiter((int(k, 2) for k in keys), dtype=np.uint64, count=len(keys))
+        freqs = np.fromiter((int(f) for f in counts.values()), dtype=np.uint32, count=len(keys))
+        return cls(indices, freqs, qubits)
+
+    @classmethod
+    def from_qiskit(cls, counts: dict, qubits: int = None) -> "Counts":
+        """From Qiskit get_counts() keys (qubit 0 rightmost), i.e. what invert_counts used to flip."""
+        return cls.from_dict(counts, qubits).reversed()
+
+    @classmethod
+    def from_string(cls, text: str, qubits: int = None) -> "Counts":
+        """Parse the str(dict) stored in the results CSVs without eval."""
+        entries = _ENTRY.findall(text)
+        if qubits is None:
+            qubits = len(entries[0][0]) if entries else 0
+        indices = np.array([int(k, 2) for k, _ in entries], dtype=np.uint64)
+        freqs = np.array([int(f) for _, f in entries], dtype=np.uint32)
+        return cls(indices, freqs, qubits)
+
+    def reversed(self) -> "Counts":
+        """The same counts with the bit order flipped (PennyLane <-> Qiskit)."""
+        return Counts(reverse_bits(self.indices, self.qubits), self.freqs, self.qubits)
+
+    def keys(self) -> list:
+        return [format(int(k), "0" + str(self.qubits) + "b") for k in self.indices]
+
+    def to_dict(self) -> dict:
+        """PennyLane-style {bitstring: frequency}."""
+        return dict(zip(self.keys(), self.freqs.tolist()))
+
+    def to_qiskit(self) -> dict:
+        """Qiskit-style {bitstring: frequency}."""
+        return self.reversed().to_dict()
+
+    @property
+    def shots(self) -> int:
+        return int(self.freqs.sum(dtype=np.uint64))
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def bit(self, node: int) -> np.ndarray:
+        """Value of node `node` in every stored basis state."""
+        return (self.indices >> np.uint64(self.qubits - 1 - node)) & np.uint64(1)
+
+    def most_frequent(self) -> str:
+        return format(int(self.indices[np.argmax(self.freqs)]), "0" + str(self.qubits) + "b")
+
+    def cut_values(self, G: nx.Graph, weighted: bool = True) -> np.ndarray:
+        """maxcut_obj of every stored basis state, one XOR of shifted indices per edge."""
+        return cut_values(G, self.qubits, self.indices, weighted)
+
+    def evaluate(self, G: nx.Graph, weighted: bool = True) -> tuple:
+        """
+        Same as maxcut.evaluate_counts on the arrays.
+        :param G: (nx.Graph) Graph, optionally with a "weight" attribute;
+        :param weighted: (bool) Use the edge weights, otherwise every cut edge counts -1;
+        :return: (tuple) Energy (shot average of the cut), minimum cut value and the keys attaining it.
+        """
+        cuts = self.cut_values(G, weighted)
+        min_value = cuts.min()
+        min_keys = [format(int(k), "0" + str(self.qubits) + "b") for k in self.indices[cuts == min_value]]
+        return float(self.freqs @ cuts / self.shots), float(min_value), min_keys
@@ -0,0 +1,70 @@
+import numpy as np
+import networkx as nx
+
+
+def edge_arrays(G: nx.Graph) -> tuple:
+    """
+    Edge list of the graph as flat arrays.
+    :param G: (nx.Graph) Graph with integer nodes 0..n-1, optionally with a "weight" attribute;
+    :return: (tuple) Arrays (u, v, w) of first nodes, second nodes and weights (1 if unweighted).
+    """
+    edges = list(G.edges.data("weight", default=1.0))
+    u = np.asarray([e[0] for e in edges], dtype=np.int64)
+    v = np.asarray([e[1] for e in edges], dtype=np.int64)
+    w = np.asarray([e[2] for e in edges], dtype=np.float64)
+    return u, v, w
+
+
+def counts_to_bits(keys: list) -> np.ndarray:
+    """
+    Bitstring keys as a (K, n) uint8 array, column i being character i (node i) of every key.
+    :param keys: (list) Equal-length strings of "0"/"1";
+    :return: (np.ndarray) The bits.
+    """
+    raw = np.frombuffer("".join(keys).encode("ascii"), dtype=np.uint8)
+    return raw.reshape(len(keys), -1) - ord("0")
+
+
+def cut_values(G: nx.Graph, num_qubits: int = None, indices: np.ndarray = None, weighted: bool = True,
+               msb_first: bool = True) -> np.ndarray:
+    """
+    maxcut_obj of basis-state indices, one XOR of shifted indices per edge.
+    :param G: (nx.Graph) Graph, optionally with a "weight" attribute;
+    :param num_qubits: (int) Number of qubits, defaults to the number of nodes;
+    :param indices: (np.ndarray) Basis-state indices, defaults to all 2**num_qubits;
+    :param weighted: (bool) Use the edge weights, otherwise every cut edge counts -1;
+    :param msb_first: (bool) Node i is bit num_qubits-1-i (PennyLane keys), otherwise bit i (Qiskit order);
+    :return: (np.ndarray) The cut values.
+    """
+    if num_qubits is None:
+        num_qubits = G.number_of_nodes()
+    if indices is None:
+        indices = np.arange(2 ** num_qubits, dtype=np.int64)
+    one = indices.dtype.type(1)
+    shift = (lambda node: indices.dtype.type(num_qubits - 1 - node)) if msb_first else indices.dtype.type
+    u, v, w = edge_arrays(G)
+    cuts = np.zeros(len(indices))
+    for i, j, weight in zip(u, v, w if weighted else np.ones_like(w)):
+        cuts -= weight * (((indices >> shift(i)) ^ (indices >> shift(j))) & one)
+    return cuts
+
+
+def evaluate_counts(counts: dict, G: nx.Graph, weighted: bool = True) -> tuple:
+    """
+    Cut values of all measured bitstrings in one pass: the keys become one bit array and each edge
+    is the XOR of two of its columns, so nothing loops over keys or edges in Python.
+    :param counts: (dict) Counts {bitstring: frequency}, character i being node i;
+    :param G: (nx.Graph) Graph, optionally with a "weight" attribute;
+    :param weighted: (bool) Use the edge weights, otherwise every cut edge counts -1 as in maxcut_obj;
+    :return: (tuple) Energy (shot average of the cut), minimum cut value and the list of keys attaining it.
+    """
+    keys = list(counts)
+    freqs = np.fromiter(counts.values(), dtype=np.float64, count=len(keys))
+    bits = counts_to_bits(keys)
+    u, v, w = edge_arrays(G)
+    if not weighted:
+        w = np.ones_like(w)
+    cuts = -((bits[:, u] ^ bits[:, v]) @ w)
+    min_value = cuts.min()
+    min_keys = [keys[k] for k in np.flatnonzero(cuts == min_value)]
+    return float(freqs @ cuts / freqs.sum()), float(min_value), min_keys
@@ -1,25 +1,34 @@
 from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister
 import networkx as nx
 import qiskit_aer as q_aer
-from utilities import execution, invert_counts
+from counts import Counts
+from circuit_QAOA import QAOATemplate
 from maxcut import *
+from cut_arrays import cut_values
 import numpy as np
 from scipy.optimize import minimize
 
 
 shots = 10_000
 layers = 2
+exact_expectation = True  ### shot-free objective; sampling is left for the final counts
 backend = q_aer.Aer.get_backend("qasm_simulator")
 
 
-def get_objective(p, G):
+def get_objective(p, G, exact=False):
+    """
+    COBYLA objective. With exact=True the energy is the expectation of maxcut_obj over the exact
+    statevector probabilities instead of an average over `shots` samples, so it is free of sampling noise.
+    """
+    template = QAOATemplate(graph=G, layers=p, backend=backend)
+    cut = cut_values(G, msb_first=False) if exact else None  ### qiskit order: bit i is qubit i
     def f(theta):
-        qaoa = QAOA_circuit(graph = G)
         beta_extracted = theta[:p]
         gamma_extracted = theta[p:]
-        qaoa_circuit = qaoa.merged_qaoa_circuit(beta=beta_extracted, gamma=gamma_extracted)
-        counts = execution(circuit=qaoa_circuit, backend=backend, shots=shots)
-        return compute_energy(invert_counts(counts=counts), G)
+        if exact:
+            return float(template.probabilities(gamma=gamma_extracted, beta=beta_extracted) @ cut)
+        counts = template.run(gamma=gamma_extracted, beta=beta_extracted, shots=shots)
+        return Counts.from_qiskit(counts).evaluate(G, weighted=False)[0]
     return f
 
 
@@ -69,7 +78,7 @@ class QAOA_circuit:
 
 
 start_params = [np.pi*np.random.rand(2*layers)/180]
-solution_result = minimize(get_objective(layers, G1), start_params, method="COBYLA", options={"maxiter": 1000, "disp": False})
+solution_result = minimize(get_objective(layers, G1, exact=exact_expectation), start_params, method="COBYLA", options={"maxiter": 1000, "disp": False})
 param_sol = solution_result["x"]
 energy_sol = solution_result["fun"]
 print("Solution array:", param_sol)
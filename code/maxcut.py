@@ -1,4 +1,4 @@
-
+from cut_arrays import evaluate_counts
 
 
 def maxcut_obj(x, G):
@@ -11,15 +11,7 @@ def maxcut_obj(x, G):
 
 
 def compute_energy(counts, G):
-    E = 0
-    tot_counts = 0
-    for meas, meas_count in counts.items():
-        obj_for_meas = maxcut_obj(meas, G)
-        E += obj_for_meas * meas_count
-        tot_counts += meas_count
-    #final_energy = 0.5*(1+E/tot_counts)
-    return E/tot_counts
-    #return final_energy
+    return evaluate_counts(counts, G, weighted=False)[0]
 
 
 def get_most_frequent_state(frequencies):
@@ -28,13 +20,9 @@ def get_most_frequent_state(frequencies):
 
 
 def maximum_cut(dict_count: dict, G):
-    new_dict = {}
-    for key in dict_count.keys():
-        new_dict[key] = maxcut_obj(key, G)
-    #val_min = min(new_dict.values())
-    min_value = min(new_dict.values())
-    min_keys = [k for k in new_dict if new_dict[k] == min_value]
-    return min_keys, min_value
+    _, min_value, min_keys = evaluate_counts(dict_count, G, weighted=False)
+    return min_keys, int(min_value)
+
 
 '''
     for key in dict_count.keys():
@@ -11,6 +11,7 @@ import numpy as np
 import pandas as pd
 import sys
 import warnings
+from ground_truth import ground_truth
 
 
 warnings.filterwarnings("ignore")
@@ -104,7 +105,7 @@ def qaoa_execution(seed: int, graph: nx.Graph, graph_sorgent: nx.Graph) -> tuple
     print("Last parameters updated:\n", params)
     counts = circuit_qnode_counts(params, graph, edge=None)
 
-    min_key, min_energy = maximum_cut(counts, graph_sorgent)
+    min_energy, min_key = ground_truth(graph_sorgent)
     print("The ground states are: ", min_key, "with energy: ", min_energy)
 
     most_freq_bit_string = max(counts, key=counts.get)
@@ -12,6 +12,7 @@ import pandas as pd
 import sys
 import warnings
 from optimal_params import opt_params, variational_opt_gamma, variational_opt_beta
+from ground_truth import ground_truth
 
 
 warnings.filterwarnings("ignore")
@@ -89,7 +90,7 @@ def qaoa_execution(graph: list, graph_sorgent: nx.Graph) -> tuple:
 
     counts = circuit_qnode_counts(graph, edge=None)
 
-    min_key, min_energy = maximum_cut(counts, graph_sorgent)
+    min_energy, min_key = ground_truth(graph_sorgent)
     print("The ground states are: ", min_key, "with energy: ", min_energy)
 
     most_freq_bit_string = max(counts, key=counts.get)
@@ -0,0 +1,127 @@
+import os
+import hashlib
+import sqlite3
+from contextlib import closing
+import numpy as np
+from maxcut_exact import _graph_arrays, exact_maxcut, branch_and_bound_maxcut
+
+
+def default_path() -> str:
+    """
+    $QAOA_GROUND_TRUTH if set, otherwise ground_truth.sqlite in the user cache directory, never the source tree.
+    :return: (str) Path of the SQLite file, its directory created if needed.
+    """
+    path = os.environ.get("QAOA_GROUND_TRUTH")
+    if path is None:
+        cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        path = os.path.join(cache_dir, "learning_qaoa", "ground_truth.sqlite")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return path
+
+
+def canonical_edges(graph) -> tuple:
+    """
+    Canonical form of a graph: node count and the (u < v) edges sorted, with their weights.
+    :param graph: (nx.Graph or tuple) Graph with nodes 0..n-1, optionally weighted, or (u, v, w) edge arrays;
+    :return: (tuple) Node count and the sorted (u, v, w) arrays.
+    """
+    nodes, u, v, w = _graph_arrays(graph)
+    u, v = np.minimum(u, v), np.maximum(u, v)
+    order = np.lexsort((v, u))
+    return nodes, u[order], v[order], w[order]
+
+
+def graph_hash(graph) -> str:
+    """SHA-256 of the node count, the sorted edge array and the float64 weights."""
+    nodes, u, v, w = canonical_edges(graph)
+    digest = hashlib.sha256(np.int64(nodes).tobytes())
+    digest.update(np.stack([u, v]).astype(np.int64).tobytes())
+    digest.update(w.astype(np.float64).tobytes())
+    return digest.hexdigest()
+
+
+class GroundTruthCache:
+    """
+    Exact MaxCut optima stored in one SQLite file, keyed by graph_hash, so that RandomGraph(N, prob, seed)
+    is solved once instead of in every script and every run. Graphs up to `exact_nodes` nodes are solved
+    by exact_maxcut, larger ones by branch_and_bound_maxcut; an optimum that did not close within the
+    time budget is stored with its gap and that budget, and only solved again by a cache with a larger
+    time_limit (the search is deterministic, so the same budget would repeat the same run).
+    """
+    def __init__(self, path: str = None, exact_nodes: int = 30, time_limit: float = 600.0) -> None:
+        self.path = default_path() if path is None else path
+        self.exact_nodes = exact_nodes
+        self.time_limit = time_limit
+        self.hits = 0
+        self.misses = 0
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS optima (hash TEXT PRIMARY KEY, nodes INTEGER, edges INTEGER, "
+                         "min_energy REAL, keys TEXT, gap REAL, time_limit REAL)")
+            if "time_limit" not in [row[1] for row in conn.execute("PRAGMA table_info(optima)")]:
+                conn.execute("ALTER TABLE optima ADD COLUMN time_limit REAL")  ### files written before the column
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=60)  ### several scripts may share the file
+
+    def get(self, graph) -> tuple:
+        """
+        :param graph: (nx.Graph or tuple) Graph or (u, v, w) edge arrays;
+        :return: (tuple) Stored minimum energy, optimal bitstrings (character i = node i), gap and the time
+                 limit it was solved with (None if unknown), or None.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT min_energy, keys, gap, time_limit FROM optima WHERE hash = ?",
+                               (graph_hash(graph),)).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1].split(","), row[2], row[3]
+
+    def put(self, graph, min_energy: float, keys: list, gap: float = 0.0, time_limit: float = None) -> None:
+        nodes, u, _, _ = canonical_edges(graph)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO optima VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (graph_hash(graph), nodes, len(u), float(min_energy), ",".join(keys), float(gap), time_limit))
+
+    def solve(self, graph) -> tuple:
+        """Solve without the cache: (min_energy, keys, gap)."""
+        nodes = _graph_arrays(graph)[0]
+        if nodes <= self.exact_nodes:
+            min_energy, keys = exact_maxcut(graph)
+            return min_energy, keys, 0.0
+        min_energy, key, _, gap = branch_and_bound_maxcut(graph, time_limit=self.time_limit)
+        complement = "".join("1" if c == "0" else "0" for c in key)
+        return min_energy, [key, complement], gap
+
+    def lookup(self, graph) -> tuple:
+        """
+        :param graph: (nx.Graph or tuple) Graph with nodes 0..n-1, optionally weighted, or (u, v, w) edge arrays;
+        :return: (tuple) Minimum energy -max_cut and optimal bitstrings, as exact_maxcut.
+        """
+        stored = self.get(graph)
+        if stored is not None and (stored[2] == 0.0 or self.time_limit <= (stored[3] or 0.0)):
+            self.hits += 1
+            return stored[0], stored[1]
+        self.misses += 1
+        min_energy, keys, gap = self.solve(graph)
+        if stored is not None and (stored[0], stored[2]) < (min_energy, gap):  ### an earlier budget did better
+            min_energy, keys, gap = stored[:3]
+        self.put(graph, min_energy, keys, gap, None if gap == 0.0 else self.time_limit)
+        return min_energy, keys
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_cache = None
+
+
+def ground_truth(graph) -> tuple:
+    """
+    Exact optimum of the graph from the shared on-disk cache (created on first use at default_path()).
+    :param graph: (nx.Graph or tuple) Graph with nodes 0..n-1, optionally weighted, or (u, v, w) edge arrays;
+    :return: (tuple) Minimum energy -max_cut and optimal bitstrings, character i = node i.
+    """
+    global _cache
+    if _cache is None:
+        _cache = GroundTruthCache()
+    return _cache.lookup(graph)
@@ -0,0 +1,167 @@
+import numpy as np
+import networkx as nx
+from collections import OrderedDict
+from networkx.algorithms.isomorphism import categorical_node_match, categorical_edge_match
+from qaoa_statevector import QAOAStatevector
+
+
+def light_cone(graph: nx.Graph, edge: tuple, layers: int) -> tuple:
+    """
+    Reverse light cone of Z_u Z_v after `layers` QAOA layers: every node within distance `layers`
+    of u or v. Gates outside it cancel in <psi|Z_u Z_v|psi>.
+    :param graph: (nx.Graph) Graph with integer nodes, optionally weighted;
+    :param edge: (tuple) The edge (u, v);
+    :param layers: (int) Number of QAOA layers;
+    :return: (tuple) Node list with u, v first, and the induced subgraph relabelled 0..m-1 in that order.
+    """
+    u, v = edge
+    reach = set(nx.single_source_shortest_path_length(graph, u, cutoff=layers))
+    reach |= set(nx.single_source_shortest_path_length(graph, v, cutoff=layers))
+    nodes = [u, v] + sorted(reach - {u, v})
+    sub = nx.relabel_nodes(graph.subgraph(nodes), {node: k for k, node in enumerate(nodes)})
+    return nodes, sub
+
+
+def root_edge_observable(sub: nx.Graph) -> np.ndarray:
+    """Diagonal of -w_01 * [z_0 != z_1], the cut term of the root edge of a light cone."""
+    qubits = sub.number_of_nodes()
+    index = np.arange(2 ** qubits, dtype=np.int64)
+    different = ((index >> (qubits - 1)) ^ (index >> (qubits - 2))) & 1
+    return -sub.edges[0, 1].get("weight", 1.0) * different
+
+
+class LightConeCache:
+    """
+    LRU memo of light-cone results keyed by the isomorphism class of the rooted, weighted cone
+    plus the parameters. Classes are found by Weisfeiler-Lehman hash and confirmed with an exact
+    isomorphism test, so that edges with identical neighbourhoods share one simulation.
+    """
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._classes = {}
+        self._n_classes = 0
+        self._results = OrderedDict()
+
+    def canonical_key(self, sub: nx.Graph) -> int:
+        """
+        Isomorphism class of a light cone whose root edge is (0, 1).
+        :param sub: (nx.Graph) Cone returned by light_cone;
+        :return: (int) Class id, equal for cones related by a root-preserving, weight-preserving isomorphism.
+        """
+        return self.canonical_form(sub)[0]
+
+    def canonical_form(self, sub: nx.Graph, weighted: bool = True) -> tuple:
+        """
+        Isomorphism class of a light cone and the cone relabelled onto the first cone of its class,
+        so that isomorphic cones also get identical node labels.
+        :param sub: (nx.Graph) Cone returned by light_cone;
+        :param weighted: (bool) Require equal weights, otherwise only the structure has to match;
+        :return: (tuple) Class id and the relabelled cone (weights kept).
+        """
+        labelled = nx.Graph()
+        labelled.add_nodes_from(sub.nodes, root=0)
+        labelled.nodes[0]["root"] = labelled.nodes[1]["root"] = 1
+        labelled.add_edges_from((i, j, {"weight": repr(float(w)) if weighted else None})
+                                for i, j, w in sub.edges.data("weight", default=1.0))
+        digest = nx.weisfeiler_lehman_graph_hash(labelled, node_attr="root", edge_attr="weight" if weighted else None)
+        bucket = self._classes.setdefault((weighted, digest), [])
+        for representative, key in bucket:
+            matcher = nx.isomorphism.GraphMatcher(labelled, representative,
+                                                  node_match=categorical_node_match("root", 0),
+                                                  edge_match=categorical_edge_match("weight", None))
+            if matcher.is_isomorphic():
+                return key, nx.relabel_nodes(sub, matcher.mapping)
+        key = self._n_classes
+        self._n_classes += 1
+        bucket.append((labelled, key))
+        return key, sub
+
+    def get(self, key: int, params: np.ndarray, grad: bool):
+        """Cached (energy, grads) or energy, None when missing; a gradient entry also serves energies."""
+        for stored_grad in ((True,) if grad else (False, True)):
+            entry = (key, params.tobytes(), stored_grad)
+            if entry in self._results:
+                self._results.move_to_end(entry)
+                self.hits += 1
+                value = self._results[entry]
+                return value if grad or not stored_grad else value[0]
+        self.misses += 1
+        return None
+
+    def put(self, key: int, params: np.ndarray, grad: bool, value) -> None:
+        self._results[(key, params.tobytes(), grad)] = value
+        self._results.move_to_end((key, params.tobytes(), grad))
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    def stats(self) -> dict:
+        calls = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / calls if calls else 0.0,
+                "size": len(self._results), "classes": self._n_classes}
+
+
+class LightConeSimulator:
+    """
+    Energy of the QAOA ansatz as a sum of per-edge terms, each simulated on its own light cone only.
+    For sparse graphs at low depth the cones stay small while the full graph can have hundreds of nodes.
+    With a LightConeCache, edges whose cones are isomorphic share one simulation per parameter set.
+    """
+    def __init__(self, graph: nx.Graph, layers: int, max_qubits: int = 24, cache: LightConeCache = None) -> None:
+        self.graph = graph
+        self.layers = layers
+        self.edges = list(graph.edges)
+        self.cones = [light_cone(graph, edge, layers) for edge in self.edges]
+        largest = max((len(nodes) for nodes, _ in self.cones), default=0)
+        if largest > max_qubits:
+            raise ValueError(f"Light cone of {largest} qubits exceeds max_qubits={max_qubits}")
+        self.cache = cache
+        if cache is None:
+            self.keys = list(range(len(self.edges)))
+        else:
+            self.keys = [cache.canonical_key(sub) for _, sub in self.cones]
+        self._engines = {}
+
+    def _engine(self, k: int) -> tuple:
+        key = self.keys[k]
+        if key not in self._engines:
+            sub = self.cones[k][1]
+            self._engines[key] = QAOAStatevector(sub), root_edge_observable(sub)
+        return self._engines[key]
+
+    def _term(self, k: int, params: np.ndarray, grad: bool):
+        if self.cache is not None:
+            value = self.cache.get(self.keys[k], params, grad)
+            if value is not None:
+                return value
+        engine, observable = self._engine(k)
+        if grad:
+            value = engine.energy_and_grad(params, observable=observable)
+        else:
+            value = engine.energy(params, observable=observable)
+        if self.cache is not None:
+            self.cache.put(self.keys[k], params, grad, value)
+        return value
+
+    def edge_energies(self, params: np.ndarray) -> np.ndarray:
+        """Cut term -0.5 * w * (1 - <Z_u Z_v>) of every edge, in graph.edges order."""
+        params = np.asarray(params, dtype=np.float64)
+        return np.array([self._term(k, params, grad=False) for k in range(len(self.edges))])
+
+    def energy(self, params: np.ndarray) -> float:
+        return float(np.sum(self.edge_energies(params)))
+
+    def energy_and_grad(self, params: np.ndarray) -> tuple:
+        """
+        Energy and gradient summed over the per-edge adjoint passes.
+        :param params: (np.ndarray) Array of shape (layers, 2) with rows (gamma, beta);
+        :return: (tuple) The energy and the (layers, 2) gradient.
+        """
+        params = np.asarray(params, dtype=np.float64)
+        energy, grads = 0.0, np.zeros_like(params)
+        for k in range(len(self.edges)):
+            term, term_grads = self._term(k, params, grad=True)
+            energy += term
+            grads += term_grads
+        return energy, grads
@@ -0,0 +1,195 @@
+import time
+import numpy as np
+import networkx as nx
+from cut_arrays import edge_arrays
+
+
+def _graph_arrays(graph) -> tuple:
+    """(nodes, u, v, w) from an nx.Graph or (u, v, w) edge arrays."""
+    if isinstance(graph, nx.Graph):
+        return (graph.number_of_nodes(),) + edge_arrays(graph)
+    u, v, w = (np.asarray(x) for x in graph)
+    nodes = int(max(u.max(), v.max())) + 1 if len(u) else 0
+    return nodes, u.astype(np.int64), v.astype(np.int64), w.astype(np.float64)
+
+
+def _doubling(coeff: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """out[x] = sum_a coeff[a] * bit_a(x), built by doubling: the upper half of every prefix adds one coefficient."""
+    out[0] = 0.0
+    for a, c in enumerate(coeff):
+        np.add(out[:2 ** a], c, out=out[2 ** a:2 ** (a + 1)])
+    return out
+
+
+def exact_maxcut(graph, chunk_bits: int = 20, max_solutions: int = 64, rtol: float = 1e-12) -> tuple:
+    """
+    Exact MaxCut by enumerating the 2**(n-1) cuts with node 0 fixed to 0. The last `chunk_bits` nodes
+    form the chunk: for a fixed assignment of the other (high) nodes the cut is a precomputed low-low
+    vector plus a term linear in the chunk bits, built by doubling in O(2**chunk_bits). The high
+    assignments are visited in Gray-code order, so every new chunk only updates the coefficients of
+    the neighbours of the single flipped node.
+    :param graph: (nx.Graph or tuple) Graph with nodes 0..n-1, optionally weighted, or (u, v, w) edge arrays;
+    :param chunk_bits: (int) Nodes enumerated per NumPy pass;
+    :param max_solutions: (int) Optimal assignments to return at most (complements included);
+    :param rtol: (float) Relative tolerance deciding ties between weighted cuts;
+    :return: (tuple) Minimum energy -max_cut (the maximum_cut convention) and optimal bitstrings, character i = node i.
+    """
+    nodes, u, v, w = _graph_arrays(graph)
+    if nodes < 2:
+        return 0.0, ["0" * nodes]
+    low_bits = min(chunk_bits, nodes - 1)
+    low = np.arange(nodes - low_bits, nodes)  ### chunk bit a is node low[a]
+    high = np.arange(1, nodes - low_bits)     ### Gray-code bit b is node high[b]
+    is_low = np.zeros(nodes, dtype=bool)
+    is_low[low] = True
+    position = np.empty(nodes, dtype=np.int64)
+    position[low] = np.arange(low_bits)
+
+    both_low = is_low[u] & is_low[v]
+    index = np.arange(2 ** low_bits, dtype=np.int64)
+    cut_low = np.zeros(2 ** low_bits)
+    for i, j, weight in zip(position[u[both_low]], position[v[both_low]], w[both_low]):
+        cut_low += weight * (((index >> i) ^ (index >> j)) & 1)
+    del index
+
+    # z = 0 everywhere outside the chunk: cross edges are cut iff the chunk bit is 1, high-high edges are not cut
+    cross = is_low[u] ^ is_low[v]
+    a = np.where(is_low[u[cross]], position[u[cross]], position[v[cross]])
+    b = np.where(is_low[u[cross]], v[cross], u[cross])
+    wc = w[cross]
+    coeff = np.bincount(a, weights=wc, minlength=low_bits)
+    offset = 0.0
+    z = np.zeros(nodes, dtype=np.int64)
+    neighbours = [[] for _ in range(nodes)]
+    for i, j, weight in zip(u[~both_low & ~cross], v[~both_low & ~cross], w[~both_low & ~cross]):
+        neighbours[i].append((j, weight))
+        neighbours[j].append((i, weight))
+    low_neighbours = [[] for _ in range(nodes)]
+    for chunk_bit, node, weight in zip(a, b, wc):
+        low_neighbours[node].append((chunk_bit, weight))
+
+    linear = np.empty(2 ** low_bits)
+    best, solutions = -np.inf, []
+    for step in range(2 ** len(high)):
+        if step:
+            node = high[(step & -step).bit_length() - 1]  ### Gray code: flip the lowest set bit of step
+            sign = 1 - 2 * z[node]                        ### +1 when the node goes 0 -> 1
+            offset += sum(weight * (1 - 2 * (z[node] != z[other])) for other, weight in neighbours[node])
+            for chunk_bit, weight in low_neighbours[node]:
+                coeff[chunk_bit] -= 2 * sign * weight
+                offset += sign * weight
+            z[node] ^= 1
+        _doubling(coeff, linear)
+        linear += cut_low
+        value = linear.max() + offset
+        tol = rtol * max(1.0, abs(value))
+        if value > best + tol:
+            best, solutions = value, []
+        if value >= best - tol and len(solutions) < max_solutions:
+            for x in np.flatnonzero(linear + offset >= best - tol)[:max_solutions - len(solutions)]:
+                assignment = z.copy()
+                assignment[low] = (x >> np.arange(low_bits)) & 1
+                solutions.append("".join(map(str, assignment)))
+    keys = []
+    for key in solutions:
+        complement = "".join("1" if c == "0" else "0" for c in key)
+        keys.extend([key, complement])
+    return -float(best), keys[:max_solutions]
+
+
+def _local_search(weights: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """Flip single nodes while the cut improves."""
+    z = z.copy()
+    while True:
+        spin = 1 - 2 * z
+        gain = spin * (weights @ spin)  ### cut gain of flipping every node: sum_i w_ij (same_ij - different_ij)
+        j = int(np.argmax(gain))
+        if gain[j] <= 1e-12:
+            return z
+        z[j] ^= 1
+
+
+def _cut_weight(weights: np.ndarray, z: np.ndarray) -> float:
+    spin = 1 - 2 * z
+    return 0.25 * float(np.sum(weights) - spin @ weights @ spin)
+
+
+def branch_and_bound_maxcut(graph, time_limit: float = 60.0, restarts: int = 16, seed: int = None) -> tuple:
+    """
+    Exact MaxCut by depth-first branch and bound, for graphs beyond the reach of exact_maxcut.
+    Nodes are fixed in decreasing weighted degree with the first one pinned to 0 (bit-flip symmetry).
+    The bound of a partial assignment is the fixed cut, plus for every free node the larger of its
+    edge weights to the two fixed sides, plus for the free-free edges the smaller of their positive
+    weight and the eigenvalue bound n_free / 4 * lambda_max(L_free) (valid for any weights).
+    The incumbent starts from spectral and random starts improved by single flips.
+    :param graph: (nx.Graph or tuple) Graph with nodes 0..n-1, optionally weighted, or (u, v, w) edge arrays;
+    :param time_limit: (float) Seconds before the search stops with the best cut found so far;
+    :param restarts: (int) Random starts of the initial local search;
+    :param seed: (int) Seed of the random starts;
+    :return: (tuple) Best energy -cut, its bitstring (character i = node i), the proven lower bound on the
+        energy and the relative optimality gap (0 when the search finished).
+    """
+    start = time.perf_counter()
+    nodes, u, v, w = _graph_arrays(graph)
+    weights = np.zeros((nodes, nodes))
+    np.add.at(weights, (u, v), w)
+    np.add.at(weights, (v, u), w)
+    if nodes < 2:
+        return 0.0, "0" * nodes, 0.0, 0.0
+
+    # incumbent
+    rng = np.random.default_rng(seed)
+    laplacian = np.diag(weights.sum(axis=1)) - weights
+    starts = [(np.linalg.eigh(laplacian)[1][:, -1] > 0).astype(np.int64)]
+    starts += [rng.integers(0, 2, nodes) for _ in range(restarts)]
+    best_z = max((_local_search(weights, z) for z in starts), key=lambda z: _cut_weight(weights, z))
+    best = [_cut_weight(weights, best_z), best_z ^ best_z[0]]
+
+    order = np.argsort(-np.abs(weights).sum(axis=1), kind="stable")
+    w_ord = weights[np.ix_(order, order)]
+    free_bound = np.zeros(nodes + 1)  ### bound on the free-free edges once the first k nodes are fixed
+    for k in range(nodes - 1):
+        sub = w_ord[k:, k:]
+        positive = 0.5 * np.sum(np.clip(sub, 0, None))
+        lap = np.diag(sub.sum(axis=1)) - sub
+        free_bound[k] = min(positive, (nodes - k) / 4 * np.linalg.eigvalsh(lap)[-1])
+
+    side = np.zeros((2, nodes))  ### side[s, j]: weight from node j to the fixed nodes on side s
+    z = np.zeros(nodes, dtype=np.int64)
+    open_bounds = []
+    visited = [0]
+
+    integral = bool(np.all(w == np.round(w)))  ### integer weights: integer cuts, so bounds can be floored
+
+    def bound(k: int, fixed: float) -> float:
+        value = fixed + float(np.sum(np.max(side[:, k:], axis=0))) + free_bound[k]
+        return np.floor(value + 1e-9) if integral else value
+
+    def visit(k: int, fixed: float) -> None:
+        upper = bound(k, fixed)
+        if upper <= best[0] + 1e-9:
+            return
+        visited[0] += 1
+        if visited[0] % 1024 == 0 and time.perf_counter() - start > time_limit:
+            open_bounds.append(upper)
+            return
+        if k == nodes:
+            z_node = np.empty(nodes, dtype=np.int64)
+            z_node[order] = z
+            best[0], best[1] = fixed, z_node
+            return
+        first = 1 if side[0, k] >= side[1, k] else 0  ### the side that cuts more fixed weight first
+        for s in ((0,) if k == 0 else (first, 1 - first)):
+            if open_bounds and time.perf_counter() - start > time_limit:
+                open_bounds.append(upper)
+                return
+            z[k] = s
+            side[s] += w_ord[k]
+            visit(k + 1, fixed + side[1 - s, k])
+            side[s] -= w_ord[k]
+
+    visit(0, 0.0)
+    cut = best[0]
+    upper = max([cut] + open_bounds)
+    gap = (upper - cut) / max(abs(upper), 1e-12)
+    return -cut, "".join(map(str, best[1])), -upper, gap
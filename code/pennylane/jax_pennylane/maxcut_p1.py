@@ -0,0 +1,140 @@
+import numpy as np
+import networkx as nx
+from cut_arrays import edge_arrays
+
+
+class P1Graph:
+    """
+    Edge and triangle arrays needed by the closed-form p=1 expectation, built once per graph
+    so that sweeps over (gamma, beta) only run the vectorised formula.
+    """
+    def __init__(self, graph) -> None:
+        if isinstance(graph, nx.Graph):
+            nodes = graph.number_of_nodes()
+            u, v, w = edge_arrays(graph)
+        else:
+            u, v, w = (np.asarray(x) for x in graph)
+            nodes = int(max(u.max(), v.max())) + 1 if len(u) else 0
+        self.nodes = nodes
+        self.u = u.astype(np.int64)
+        self.v = v.astype(np.int64)
+        self.w = w.astype(np.float64)
+        self._triangles()
+
+    def _triangles(self) -> None:
+        """For every edge (u, v) and common neighbour x store J_ux and J_vx."""
+        n, u, v, w = self.nodes, self.u, self.v, self.w
+        src, dst, wts = np.concatenate([u, v]), np.concatenate([v, u]), np.concatenate([w, w])
+        order = np.argsort(src * n + dst)
+        src, dst, wts = src[order], dst[order], wts[order]
+        keys = src * n + dst
+        degree = np.bincount(src, minlength=n)
+        indptr = np.concatenate([[0], np.cumsum(degree)])
+
+        # walk the neighbours of the lower-degree endpoint and look the third edge up
+        a = np.where(degree[u] <= degree[v], u, v)
+        b = np.where(degree[u] <= degree[v], v, u)
+        counts = degree[a]
+        edge = np.repeat(np.arange(len(u)), counts)
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        position = np.repeat(indptr[a], counts) + offset
+        x, j_ax = dst[position], wts[position]
+        lookup = np.minimum(np.searchsorted(keys, b[edge] * n + x), max(len(keys) - 1, 0))
+        common = (keys[lookup] == b[edge] * n + x) & (x != b[edge])
+
+        self.node_half_edges = src, wts
+        self.tri_edge = edge[common]
+        self.tri_ja = j_ax[common]
+        self.tri_jb = wts[lookup[common]]
+
+
+def _log_cos(coeff: np.ndarray, gamma: float) -> np.ndarray:
+    """
+    Rows (log|cos|, [cos < 0], d log|cos| / d gamma, [cos = 0], d cos / d gamma) of the factors
+    cos(2 gamma coeff), so that products and leave-one-out products become sums and differences.
+    Zero factors are counted in row 3 instead of entering the log, with their derivative in row 4.
+    """
+    theta = 2 * gamma * coeff
+    c = np.cos(theta)
+    zero = np.abs(c) < 1e-12  ### cos(pi / 2) is 6e-17 in floating point, not 0
+    safe = np.where(zero, 1.0, c)
+    return np.stack([np.log(np.abs(safe)), (safe < 0).astype(np.float64), -2 * coeff * np.tan(np.where(zero, 0.0, theta)),
+                     zero.astype(np.float64), np.where(zero, -2 * coeff * np.sin(theta), 0.0)])
+
+
+def _product(log_terms: np.ndarray) -> tuple:
+    """Product and its gamma derivative from summed _log_cos rows."""
+    sign = 1 - 2 * (np.rint(log_terms[1]) % 2)
+    rest = sign * np.exp(log_terms[0])  ### product of the non-zero factors
+    zeros = np.rint(log_terms[3])
+    value = np.where(zeros == 0, rest, 0.0)
+    derivative = np.where(zeros == 0, rest * log_terms[2], np.where(zeros == 1, rest * log_terms[4], 0.0))
+    return value, derivative
+
+
+def _edge_terms(g: P1Graph, gamma: float, beta: float) -> tuple:
+    """<Z_u Z_v> per edge at p=1 and its derivatives with respect to gamma and beta."""
+    src, wts = g.node_half_edges
+    node_log = np.stack([np.bincount(src, weights=row, minlength=g.nodes) for row in _log_cos(wts, gamma)])
+    own = _log_cos(g.w, gamma)
+    log_a = node_log[:, g.u] - own
+    log_b = node_log[:, g.v] - own
+
+    # common neighbours x contribute cos(2 gamma (J_ux +- J_vx)) instead of cos(2 gamma J_ux) cos(2 gamma J_vx)
+    single = _log_cos(g.tri_ja, gamma) + _log_cos(g.tri_jb, gamma)
+    log_plus, log_minus = log_a + log_b, log_a + log_b
+    for log_pm, coeff in ((log_plus, g.tri_ja + g.tri_jb), (log_minus, g.tri_ja - g.tri_jb)):
+        correction = _log_cos(coeff, gamma) - single
+        for row in range(len(correction)):
+            log_pm[row] += np.bincount(g.tri_edge, weights=correction[row], minlength=len(g.u))
+
+    a, da = _product(log_a)
+    b, db = _product(log_b)
+    plus, dplus = _product(log_plus)
+    minus, dminus = _product(log_minus)
+    sin_w, cos_w = np.sin(2 * gamma * g.w), np.cos(2 * gamma * g.w)
+    s4, c4, s2 = np.sin(4 * beta), np.cos(4 * beta), np.sin(2 * beta)
+
+    zz = 0.5 * s4 * sin_w * (a + b) - 0.5 * s2 ** 2 * (plus - minus)
+    dzz_gamma = 0.5 * s4 * (2 * g.w * cos_w * (a + b) + sin_w * (da + db)) - 0.5 * s2 ** 2 * (dplus - dminus)
+    dzz_beta = 2 * c4 * sin_w * (a + b) - s4 * (plus - minus)
+    return zz, dzz_gamma, dzz_beta
+
+
+def p1_expectations(graph, gamma: float, beta: float) -> np.ndarray:
+    """
+    Closed-form <Z_u Z_v> of every edge for one QAOA layer (GammaCircuit then BetaCircuit).
+    :param graph: (nx.Graph, tuple or P1Graph) Graph, (u, v, w) edge arrays or a prepared P1Graph;
+    :param gamma: (float) Cost angle;
+    :param beta: (float) Mixer angle;
+    :return: (np.ndarray) Expectations in edge_arrays order.
+    """
+    g = graph if isinstance(graph, P1Graph) else P1Graph(graph)
+    return _edge_terms(g, gamma, beta)[0]
+
+
+def p1_energy(graph, gamma: float, beta: float) -> float:
+    """
+    Closed-form p=1 MaxCut energy sum_(u,v) -0.5 * w_uv * (1 - <Z_u Z_v>), the quantity the
+    statevector scripts optimise, in O(|E| + #triangles) time.
+    :param graph: (nx.Graph, tuple or P1Graph) Graph, (u, v, w) edge arrays or a prepared P1Graph;
+    :param gamma: (float) Cost angle;
+    :param beta: (float) Mixer angle;
+    :return: (float) The energy.
+    """
+    g = graph if isinstance(graph, P1Graph) else P1Graph(graph)
+    zz = _edge_terms(g, gamma, beta)[0]
+    return float(np.sum(-0.5 * g.w * (1 - zz)))
+
+
+def p1_grad(graph, gamma: float, beta: float) -> np.ndarray:
+    """
+    Gradient of p1_energy.
+    :param graph: (nx.Graph, tuple or P1Graph) Graph, (u, v, w) edge arrays or a prepared P1Graph;
+    :param gamma: (float) Cost angle;
+    :param beta: (float) Mixer angle;
+    :return: (np.ndarray) Array [dE/dgamma, dE/dbeta].
+    """
+    g = graph if isinstance(graph, P1Graph) else P1Graph(graph)
+    _, dzz_gamma, dzz_beta = _edge_terms(g, gamma, beta)
+    return np.array([np.sum(0.5 * g.w * dzz_gamma), np.sum(0.5 * g.w * dzz_beta)])
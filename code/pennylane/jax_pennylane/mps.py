@@ -0,0 +1,142 @@
+import numpy as np
+import networkx as nx
+
+
+SWAP = np.eye(4).reshape(2, 2, 2, 2).transpose(1, 0, 2, 3)  ### gate[s1', s2', s1, s2]
+PAULI_Z = np.array([1.0, -1.0])
+
+
+def bandwidth_order(graph: nx.Graph) -> list:
+    """Reverse Cuthill-McKee order of the nodes, so that edges join nearby MPS sites."""
+    return list(nx.utils.reverse_cuthill_mckee_ordering(graph))
+
+
+class MPSSimulator:
+    """
+    Matrix-product-state simulation of the QAOA ansatz (GammaCircuit/BetaCircuit layers).
+    Nodes are placed on a chain in bandwidth-minimising order; every ZZ phase is applied between
+    neighbouring sites after a SWAP network, and each two-site update is truncated to bond_dim.
+    The discarded weight is accumulated in truncation_error.
+    """
+    def __init__(self, graph: nx.Graph, bond_dim: int = 64, cutoff: float = 1e-12, order: list = None) -> None:
+        self.graph = graph
+        self.qubits = graph.number_of_nodes()
+        self.bond_dim = bond_dim
+        self.cutoff = cutoff
+        self.order = bandwidth_order(graph) if order is None else list(order)
+        self.site = {node: k for k, node in enumerate(self.order)}
+        self.edges = sorted((min(self.site[i], self.site[j]), max(self.site[i], self.site[j]), w)
+                            for i, j, w in graph.edges.data("weight", default=1.0))
+        self.reset()
+
+    def reset(self) -> None:
+        """|+>^n as a product state with bond dimension 1."""
+        self.tensors = [np.full((1, 2, 1), 1 / np.sqrt(2), dtype=np.complex128) for _ in range(self.qubits)]
+        self.center = 0
+        self.truncation_error = 0.0
+        self.max_bond = 1
+
+    def _move_center(self, site: int) -> None:
+        while self.center < site:
+            a = self.tensors[self.center]
+            q, r = np.linalg.qr(a.reshape(-1, a.shape[2]))
+            self.tensors[self.center] = q.reshape(a.shape[0], 2, -1)
+            self.tensors[self.center + 1] = np.einsum("kb,bsc->ksc", r, self.tensors[self.center + 1])
+            self.center += 1
+        while self.center > site:
+            a = self.tensors[self.center]
+            q, r = np.linalg.qr(a.reshape(a.shape[0], -1).conj().T)
+            self.tensors[self.center] = q.conj().T.reshape(-1, 2, a.shape[2])
+            self.tensors[self.center - 1] = np.einsum("asb,bk->ask", self.tensors[self.center - 1], r.conj().T)
+            self.center -= 1
+
+    def _apply_two_site(self, site: int, gate: np.ndarray) -> None:
+        """Apply gate[s1', s2', s1, s2] on sites (site, site + 1) and truncate the new bond."""
+        self._move_center(site)
+        theta = np.einsum("asb,btc->astc", self.tensors[site], self.tensors[site + 1])
+        theta = np.einsum("uvst,astc->auvc", gate, theta)
+        left, right = theta.shape[0], theta.shape[3]
+        u, s, vh = np.linalg.svd(theta.reshape(2 * left, 2 * right), full_matrices=False)
+        weight = s ** 2 / np.sum(s ** 2)
+        keep = max(1, min(self.bond_dim, int(np.sum(weight > self.cutoff))))
+        self.truncation_error += float(np.sum(weight[keep:]))
+        s = s[:keep] / np.linalg.norm(s[:keep])
+        self.tensors[site] = u[:, :keep].reshape(left, 2, keep)
+        self.tensors[site + 1] = (s[:, None] * vh[:keep]).reshape(keep, 2, right)
+        self.center = site + 1
+        self.max_bond = max(self.max_bond, keep)
+
+    def apply_cost(self, gamma: float) -> None:
+        zz = np.array([[1, -1], [-1, 1]])
+        for a, b, w in self.edges:
+            gate = np.zeros((2, 2, 2, 2), dtype=np.complex128)
+            phase = np.exp(-1j * gamma * w * zz)
+            for s1 in range(2):
+                for s2 in range(2):
+                    gate[s1, s2, s1, s2] = phase[s1, s2]
+            for k in range(b - 1, a, -1):  ### bring site b next to a
+                self._apply_two_site(k, SWAP)
+            self._apply_two_site(a, gate)
+            for k in range(a + 1, b):
+                self._apply_two_site(k, SWAP)
+
+    def apply_mixer(self, beta: float) -> None:
+        c, s = np.cos(beta), -1j * np.sin(beta)
+        rx = np.array([[c, s], [s, c]])
+        self.tensors = [np.einsum("ts,asb->atb", rx, a) for a in self.tensors]
+
+    def run(self, params: np.ndarray) -> None:
+        """
+        Evolve |+>^n through the QAOA layers.
+        :param params: (np.ndarray) Array of shape (layers, 2) with rows (gamma, beta).
+        """
+        self.reset()
+        for gamma, beta in np.asarray(params, dtype=np.float64):
+            self.apply_cost(gamma)
+            self.apply_mixer(beta)
+
+    def edge_expectations(self) -> np.ndarray:
+        """<Z_i Z_j> of every edge of the current state, in the (sorted) order of self.edges."""
+        zz = np.empty(len(self.edges))
+        for k, (a, b, _) in enumerate(self.edges):
+            self._move_center(a)
+            env = np.einsum("asb,s,asc->bc", self.tensors[a].conj(), PAULI_Z, self.tensors[a])
+            for site in range(a + 1, b + 1):
+                op = PAULI_Z if site == b else np.ones(2)
+                env = np.einsum("bc,bsd,s,cse->de", env, self.tensors[site].conj(), op, self.tensors[site])
+            zz[k] = np.trace(env).real
+        return zz
+
+    def energy(self, params: np.ndarray) -> float:
+        """MaxCut energy sum -0.5 * w * (1 - <Z_i Z_j>) of the QAOA state."""
+        self.run(params)
+        w = np.array([e[2] for e in self.edges])
+        return float(np.sum(-0.5 * w * (1 - self.edge_expectations())))
+
+    def sample(self, shots: int, seed: int = None, batch: int = 10_000) -> dict:
+        """
+        Sample the current state site by site from its right-canonical form.
+        :param shots: (int) Number of shots;
+        :param seed: (int) Seed of the random generator;
+        :param batch: (int) Shots propagated together;
+        :return: (dict) Counts with the same bitstring keys as qml.counts() (character i is node i).
+        """
+        rng = np.random.default_rng(seed)
+        self._move_center(0)
+        counts = {}
+        for start in range(0, shots, batch):
+            n = min(batch, shots - start)
+            env = np.ones((n, 1), dtype=np.complex128)
+            bits = np.empty((n, self.qubits), dtype=np.uint8)
+            for site, a in enumerate(self.tensors):
+                t = np.einsum("na,asb->nsb", env, a)
+                p = np.sum(np.abs(t) ** 2, axis=2)
+                outcome = rng.random(n) * p.sum(axis=1) >= p[:, 0]
+                env = t[np.arange(n), outcome.astype(np.int64)]
+                env /= np.linalg.norm(env, axis=1, keepdims=True)
+                bits[:, self.order[site]] = outcome
+            keys, hits = np.unique(bits, axis=0, return_counts=True)
+            for key, hit in zip(keys, hits):
+                bitstring = "".join(map(str, key))
+                counts[bitstring] = counts.get(bitstring, 0) + int(hit)
+        return counts
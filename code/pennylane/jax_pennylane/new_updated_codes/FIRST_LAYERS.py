@@ -12,6 +12,7 @@ import sys
 import warnings
 from optimal_params import opt_beta_gamma
 import os
+from ground_truth import ground_truth
 
 
 os.environ['CUDA_VISIBLE_DEVICES'] = '0'
@@ -138,7 +139,7 @@ def qaoa_execution(seed: int, graph: nx.Graph, graph_sorgent: nx.Graph) -> tuple
     print("Last parameters updated:\n", total_params)
     counts = circuit_qnode_countsNEW(total_params, graph, edge=None)
 
-    min_key, min_energy = maximum_cut(counts, graph_sorgent)
+    min_energy, min_key = ground_truth(graph_sorgent)
     print("The ground states are: ", min_key, "with energy: ", min_energy)
 
     most_freq_bit_string = max(counts, key=counts.get)
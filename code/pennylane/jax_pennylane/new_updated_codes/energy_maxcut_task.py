@@ -2,6 +2,8 @@ from pandas import read_csv, DataFrame
 from numpy import save, asarray, abs, load, loadtxt
 from RandomGraphGeneration import RandomGraph
 from maxcut import maxcut_obj
+from counts import Counts
+from ground_truth import ground_truth
 
 
 prob = 0.6  ## probability of forming a connection between edges
@@ -12,25 +14,19 @@ seed_list = list(range(40)) ### number of seeds (i.e. # of graphs generated)
 def energy_maxcut(file: DataFrame) -> tuple[list, list]:
     """
     :param file: (pd.DataFrame) DataFrame generated by the QAOA algorithm we run;
-    :return: (tuple) A tuple containing the energy extracted from the approx. ratio and the maxcut value.
+    :return: (tuple) A tuple containing the exact minimum energy of every graph and the maxcut value.
     """
-    ar_col = file["Approx. ratio"]
-    e_qaoa_col = file["Ground energy"]
-    counts_col = file["Counts"]  ### these are strings, must converted to dictonaries
-
-    ### approx ratio = energy_qaoa / min_energy
+    counts_col = file["Counts"]  ### these are strings, parsed into Counts arrays
 
     energy_list, maxcut_list = [], []
 
-    for (i, j) in zip(range(len(ar_col)), range(len(seed_list))):
-        theorical_energy_dict = {"Seed": seed_list[j], "Min energy": int(e_qaoa_col[i] / ar_col[i])}
-        energy_list.append(theorical_energy_dict)
-
     for (i, j) in zip(range(len(counts_col)), range(len(seed_list))):
 
         current_graph = RandomGraph(node=N, prob=prob, seed=seed_list[j])
-        counts_dict = eval(counts_col[i])
-        max_cut_bitstring = max(counts_dict, key=counts_dict.get)
+        min_energy, _ = ground_truth(current_graph)  ### cached optimum instead of energy_qaoa / approx. ratio
+        theorical_energy_dict = {"Seed": seed_list[j], "Min energy": int(min_energy)}
+        energy_list.append(theorical_energy_dict)
+        max_cut_bitstring = Counts.from_string(counts_col[i]).most_frequent()
 
         max_cut_value = maxcut_obj(max_cut_bitstring, current_graph)
 
@@ -7,6 +7,10 @@ import numpy as np
 import pandas as pd
 import sys
 import warnings
+from qaoa_statevector import PrecisionPolicy
+from qaoa_batched import MultiGraphPrecisionPolicy
+from cut_arrays import evaluate_counts
+from ground_truth import ground_truth
 
 warnings.filterwarnings("ignore")
 
@@ -46,13 +50,7 @@ def maxcut_obj(x, G):
 
 
 def compute_energy(counts, G):
-    E = 0
-    tot_counts = 0
-    for meas, meas_count in counts.items():
-        obj_for_meas = maxcut_obj(meas, G)
-        E += obj_for_meas * meas_count
-        tot_counts += meas_count
-    return E / tot_counts
+    return evaluate_counts(counts, G)[0]  ### weighted, vectorised over the counts keys
 
 
 def get_most_frequent_state(frequencies):
@@ -61,11 +59,7 @@ def get_most_frequent_state(frequencies):
 
 
 def maximum_cut(dict_count: dict, G):
-    new_dict = {}
-    for key in dict_count.keys():
-        new_dict[key] = maxcut_obj(key, G)
-    min_value = min(new_dict.values())
-    min_keys = [k for k in new_dict if new_dict[k] == min_value]
+    _, min_value, min_keys = evaluate_counts(dict_count, G)
     return min_keys, min_value
 
 
@@ -142,28 +136,7 @@ def circuit_qnode_counts(weights: jnp.asarray, graph: nx.Graph, edge=None) -> qm
 
 
 def qaoa_execution(seed: int, graph_sorgent: nx.Graph) -> tuple:
-    @jax.jit
-    def obj_function(weights: jnp.asarray):
-        cost = 0
-        graph = list(graph_sorgent.edges)
-        for edge in graph:
-            cost -= 0.5 * (1 - circuit_qnode(weights, graph_sorgent, edge=edge))
-        return cost
-
-    @jax.jit
-    def cost_function(params: jnp.asarray):
-        graph = list(graph_sorgent.edges)
-        #print(graph)
-        weights_nx = graph_sorgent.edges.data("weight")
-        weighted_cost = 0
-        for (edge, w) in zip(graph, weights_nx):
-            # start_node = edge[0]
-            # end_node = edge[1]
-            weight = w[2]
-            weighted_cost -= 0.5 * weight * (1 - circuit_qnode(params, graph_sorgent, edge=edge))
-
-        return weighted_cost
-
+    engine = PrecisionPolicy(graph_sorgent, threshold, qubits)
     cost = []
     optax_optimizer = optax.adagrad(learning_rate=0.1)  ### Adagrad
     key = jax.random.PRNGKey(seed)
@@ -171,21 +144,23 @@ def qaoa_execution(seed: int, graph_sorgent: nx.Graph) -> tuple:
     params = 0.01 * jnp.asarray(w)
     opt_state = optax_optimizer.init(params)
     steps = 500
-    prev_obj_val = cost_function(params)
+    prev_obj_val = engine.energy(params)
     num_occurrances = 0
     for i in range(steps):
 
-        f = jnp.asarray(cost_function(params))
+        prev_params = params
+        f, grads = engine.energy_and_grad(params)
+        f = jnp.asarray(f)
 
         if f != 0:
-            grads = jax.grad(cost_function)(params)
-            updates, opt_state = optax_optimizer.update(grads, opt_state)
+            updates, opt_state = optax_optimizer.update(jnp.asarray(grads), opt_state)
             params = optax.apply_updates(params, updates)
-            current_obj_val = cost_function(params)
+            current_obj_val = engine.energy(params)
             print(f"It {i}:", current_obj_val)
         else:
             break
 
+        prev_obj_val, current_obj_val = engine.confirm(prev_params, params, prev_obj_val, current_obj_val)
         if prev_obj_val - current_obj_val > 0 and prev_obj_val - current_obj_val < threshold:
             num_occurrances += 1
         if num_occurrances > 3:
@@ -194,10 +169,13 @@ def qaoa_execution(seed: int, graph_sorgent: nx.Graph) -> tuple:
         cost.append(current_obj_val)
 
     print("Last parameters updated:\n", params)
+    return execution_summary(params, graph_sorgent, engine.energy(params), cost, i)
+
 
+def execution_summary(params: jnp.asarray, graph_sorgent: nx.Graph, energy: float, cost: list, i: int) -> tuple:
     counts = circuit_qnode_counts(params, graph_sorgent, edge=None)
 
-    min_key, min_energy = maximum_cut(counts, graph_sorgent)
+    min_energy, min_key = ground_truth(graph_sorgent)
     print("The ground states are: ", min_key, "with energy: ", min_energy)
 
     most_freq_bit_string = max(counts, key=counts.get)
@@ -206,10 +184,61 @@ def qaoa_execution(seed: int, graph_sorgent: nx.Graph) -> tuple:
     print("Most frequent bit-string is: ", most_freq_bit_string)
     print("The cut value of most frequent bit-string is: ", maxcut_val)
 
-    approximation_ratio = jnp.divide(cost_function(params), min_energy)
+    approximation_ratio = jnp.divide(energy, min_energy)
     print(approximation_ratio)
 
-    return -cost_function(params), counts, params, approximation_ratio, min_key, cost, i, maxcut_val, min_energy
+    return -energy, counts, params, approximation_ratio, min_key, cost, i, maxcut_val, min_energy
+
+
+def batched_qaoa_execution(seeds: list, graphs: list) -> list:
+    """
+    qaoa_execution for K same-size graphs at once: stacked (K, layers, 2) parameters, one batched
+    adjoint pass and one Adagrad update per step for all graphs still running. A graph leaves the
+    batch when it would have left the loop of qaoa_execution.
+    """
+    engine = MultiGraphPrecisionPolicy(graphs, threshold, qubits)
+    optax_optimizer = optax.adagrad(learning_rate=0.1)  ### elementwise, so stacking keeps every graph independent
+    params = 0.01 * jnp.stack([jax.random.uniform(jax.random.PRNGKey(seed), shape=(layers, 2)) for seed in seeds])
+    opt_state = optax_optimizer.init(params)
+    steps = 500
+    prev_obj_val = engine.energies(params)
+    num_occurrances = np.zeros(len(graphs), dtype=int)
+    active = np.ones(len(graphs), dtype=bool)
+    last_step = np.full(len(graphs), steps - 1)
+    cost = [[] for _ in graphs]
+    for i in range(steps):
+        rows = np.flatnonzero(active)
+        prev_params = np.asarray(params)
+        f, grads = engine.energies_and_grads(prev_params[rows], rows)
+        stopped = rows[f == 0]
+        active[stopped], last_step[stopped] = False, i
+        rows = rows[f != 0]
+        if len(rows) == 0:
+            break
+
+        full_grads = np.zeros(params.shape)
+        full_grads[rows] = grads[f != 0]
+        updates, opt_state = optax_optimizer.update(jnp.asarray(full_grads), opt_state)
+        updates = jnp.where(jnp.asarray(active)[:, None, None], updates, 0.0)  ### freeze finished graphs
+        params = optax.apply_updates(params, updates)
+        current_obj_val = engine.energies(np.asarray(params)[rows], rows)
+        print(f"It {i}:", current_obj_val)
+
+        prev_obj_val[rows], current_obj_val = engine.confirm(prev_params[rows], np.asarray(params)[rows],
+                                                             prev_obj_val[rows], current_obj_val, rows)
+        change = prev_obj_val[rows] - current_obj_val
+        num_occurrances[rows] += (change > 0) & (change < threshold)
+        done = num_occurrances[rows] > 3
+        active[rows[done]], last_step[rows[done]] = False, i
+        prev_obj_val[rows] = current_obj_val
+        for k, value in zip(rows[~done], current_obj_val[~done]):
+            cost[k].append(value)
+        if not active.any():
+            break
+
+    print("Last parameters updated:\n", params)
+    energies = engine.energies(params)
+    return [execution_summary(params[k], graphs[k], energies[k], cost[k], int(last_step[k])) for k in range(len(graphs))]
 
 
 def new_experiment() -> list:
@@ -224,15 +253,15 @@ def new_experiment() -> list:
      maxcut_list,
      ground_truth_list) = ([], [], [], [], [], [], [], [], [])
 
-    s = 0  # Start with seed 0
-    while COUNT_GRAPH < 40:  # Ensure we stop after 40 graphs
-        print(f"Iteration: {s}")
-        # graph_generator = RandomGraph(qubits, prob=0.6, seed=s)
-        # graph_generator = CreateWeightedGraph(s)
-        graph_generator = FromErdosRenyiiWeightedGraph(s)
+    seeds = list(range(40))  # 40 graphs, seeds 0..39
+    # graph_generator = RandomGraph(qubits, prob=0.6, seed=s)
+    # graph_generator = CreateWeightedGraph(s)
+    graphs = [FromErdosRenyiiWeightedGraph(s) for s in seeds]
 
-        # if nx.is_connected(graph_generator):  # Process only if the graph is connected
-        energy, counts, opt_beta_gamma, ar, minkey, cost, last_step, maxcut, ground_truth = qaoa_execution(s, graph_generator)
+    # all graphs have `qubits` nodes, so they are optimised as one batch instead of 40 serial runs
+    for s, result in zip(seeds, batched_qaoa_execution(seeds, graphs)):
+        print(f"Iteration: {s}")
+        energy, counts, opt_beta_gamma, ar, minkey, cost, last_step, maxcut, exact_min = result
         energy_res.append(energy)
         opt_beta_gamma_res.append(opt_beta_gamma)
         ar_res.append(ar)
@@ -241,10 +270,9 @@ def new_experiment() -> list:
         energy_cost.append(cost)
         iter_list.append(last_step)
         maxcut_list.append(maxcut)
-        ground_truth_list.append(ground_truth)
+        ground_truth_list.append(exact_min)
         COUNT_GRAPH += 1
         print("N graph used = ", COUNT_GRAPH)
-        s += 1
 
     print("Stop.")
 
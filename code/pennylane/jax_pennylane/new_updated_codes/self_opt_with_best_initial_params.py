@@ -11,8 +11,10 @@ import numpy as np
 import pandas as pd
 import sys
 import warnings
+from qaoa_statevector import PrecisionPolicy
 import os
 from optimal_params import opt_beta_gamma
+from ground_truth import ground_truth
 
 
 jax.config.update('jax_platform_name', 'cpu')
@@ -77,13 +79,7 @@ def circuit_qnode_counts(weights: jnp.asarray, graph: nx.Graph, edge=None) -> qm
 
 
 def qaoa_execution(seed: int, graph: nx.Graph, graph_sorgent: nx.Graph) -> tuple:
-    #@jax.jit
-    def obj_function(weights: jnp.asarray):
-        cost = 0
-        for edge in graph:
-            cost -= 0.5 * (1 - circuit_qnode(weights, graph, edge=edge))
-        return cost
-
+    engine = PrecisionPolicy(graph_sorgent, threshold, qubits)
     cost = []
     optax_optimizer = optax.adagrad(learning_rate=0.1)  ### Adagrad
     #key = jax.random.PRNGKey(seed)
@@ -92,19 +88,21 @@ def qaoa_execution(seed: int, graph: nx.Graph, graph_sorgent: nx.Graph) -> tuple
     #params = 0.01 * jnp.asarray(w)
     opt_state = optax_optimizer.init(params)
     steps = 500
-    prev_obj_val = obj_function(params)
+    prev_obj_val = engine.energy(params)
     num_occurrances = 0
     for i in range(steps):
-        f = jnp.asarray(obj_function(params))
+        prev_params = params
+        f, grads = engine.energy_and_grad(params)
+        f = jnp.asarray(f)
         if f != 0:
-            grads = jax.grad(obj_function)(params)
-            updates, opt_state = optax_optimizer.update(grads, opt_state)
+            updates, opt_state = optax_optimizer.update(jnp.asarray(grads), opt_state)
             params = optax.apply_updates(params, updates)
-            current_obj_val = obj_function(params)
+            current_obj_val = engine.energy(params)
             print(f"It {i}:", current_obj_val)
         else:
             break
 
+        prev_obj_val, current_obj_val = engine.confirm(prev_params, params, prev_obj_val, current_obj_val)
         if prev_obj_val - current_obj_val > 0 and prev_obj_val - current_obj_val < threshold:
             num_occurrances += 1
         if num_occurrances > 3:
@@ -115,7 +113,7 @@ def qaoa_execution(seed: int, graph: nx.Graph, graph_sorgent: nx.Graph) -> tuple
     print("Last parameters updated:\n", params)
     counts = circuit_qnode_counts(params, graph, edge=None)
 
-    min_key, min_energy = maximum_cut(counts, graph_sorgent)
+    min_energy, min_key = ground_truth(graph_sorgent)
     print("The ground states are: ", min_key, "with energy: ", min_energy)
 
     most_freq_bit_string = max(counts, key=counts.get)
@@ -124,10 +122,10 @@ def qaoa_execution(seed: int, graph: nx.Graph, graph_sorgent: nx.Graph) -> tuple
     print("Most frequent bit-string is: ", most_freq_bit_string)
     print("The cut value of most frequent bit-string is: ", maxcut_val)
 
-    approximation_ratio = jnp.divide(obj_function(params), min_energy)
+    approximation_ratio = jnp.divide(engine.energy(params), min_energy)
     print(approximation_ratio)
 
-    return -obj_function(params), counts, params, approximation_ratio, min_key, cost, i
+    return -engine.energy(params), counts, params, approximation_ratio, min_key, cost, i
 
 
 def new_experiment() -> list:
@@ -0,0 +1,301 @@
+import os
+import time
+import tempfile
+import numpy as np
+import networkx as nx
+from cut_arrays import edge_arrays
+from qaoa_statevector import _rotate
+
+
+class MemmapQAOAStatevector:
+    """
+    Out-of-core statevector of the QAOA ansatz, kept in a memory-mapped file and processed in chunks
+    of 2**chunk_qubits amplitudes. A chunk holds the amplitudes sharing the values of the top (global)
+    wires, so the cost phase and the mixer on the low (local) wires are one read-modify-write pass per
+    chunk, and every global wire of the mixer is one blocked pass over pairs of chunks.
+    Per-layer timings and throughput are appended to layer_stats. energy/energy_and_grad match
+    QAOAStatevector, so the engine can back PrecisionPolicy; the adjoint gradient keeps lambda in a second
+    scratch file next to `path`. An existing `path` is only reused with overwrite=True; used in a with block
+    the engine closes (and removes its temporary files) on exit.
+    """
+    def __init__(self, graph: nx.Graph, qubits: int = None, path: str = None, chunk_qubits: int = 20,
+                 dtype=np.complex128, overwrite: bool = False) -> None:
+        self.graph = graph
+        self.qubits = graph.number_of_nodes() if qubits is None else qubits
+        self.dtype = np.dtype(dtype)
+        self.chunk_qubits = max(1, min(chunk_qubits, self.qubits))
+        self.global_qubits = self.qubits - self.chunk_qubits
+        self.chunk = 2 ** self.chunk_qubits
+        self.chunks = 2 ** self.global_qubits
+        self._owned = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix=".amp")
+            os.close(fd)
+        elif os.path.exists(path) and not overwrite:
+            raise FileExistsError(f"{path} exists, pass overwrite=True to reuse it for the statevector")
+        self.path = path
+        self.state = np.memmap(path, dtype=self.dtype, mode="w+", shape=(2 ** self.qubits,))
+        self._adjoint, self._adjoint_path = None, None  ### created by the first energy_and_grad call
+        self._buffer = np.empty(self.chunk, dtype=self.dtype)
+        self._partner = np.empty_like(self._buffer)
+        self._work = np.empty_like(self._buffer)
+        self._cut = np.empty(self.chunk, dtype=np.finfo(self.dtype).dtype)
+        self._split_edges()
+        self.layer_stats = []
+        self.reset()
+
+    def _split_edges(self) -> None:
+        """Sort the edges into local-local (one cut vector per chunk size), global-global and cross edges."""
+        u, v, w = edge_arrays(self.graph)
+        is_global = lambda node: node < self.global_qubits  ### wire 0 is the most significant bit
+        self._index = np.arange(self.chunk, dtype=np.int64)
+        self._local_cut = np.zeros(self.chunk, dtype=self._cut.dtype)
+        self._global_edges, self._cross_edges = [], []
+        for i, j, weight in zip(u, v, w):
+            if not is_global(i) and not is_global(j):
+                different = ((self._index >> (self.qubits - 1 - i)) ^ (self._index >> (self.qubits - 1 - j))) & 1
+                self._local_cut -= weight * different
+            elif is_global(i) and is_global(j):
+                self._global_edges.append((i, j, weight))
+            else:
+                g, l = (i, j) if is_global(i) else (j, i)
+                self._cross_edges.append((g, l, weight))
+        self._local_bits = {l: ((self._index >> (self.qubits - 1 - l)) & 1).astype(self._cut.dtype)
+                            for l in sorted({l for _, l, _ in self._cross_edges})}
+
+    def _global_bit(self, chunk: int, node: int) -> int:
+        return (chunk >> (self.global_qubits - 1 - node)) & 1
+
+    def chunk_cut(self, chunk: int) -> np.ndarray:
+        """Cut values of the amplitudes of one chunk, built from the local cut vector and the chunk's global bits."""
+        cut = self._cut
+        cut[:] = self._local_cut
+        offset = -sum(w for i, j, w in self._global_edges if self._global_bit(chunk, i) != self._global_bit(chunk, j))
+        coeff = dict.fromkeys(self._local_bits, 0.0)
+        for g, l, w in self._cross_edges:  ### [z_g != z_l] is z_l if z_g = 0 and 1 - z_l otherwise
+            if self._global_bit(chunk, g):
+                offset -= w
+                coeff[l] += w
+            else:
+                coeff[l] -= w
+        for l, bits in self._local_bits.items():
+            if coeff[l]:
+                cut += coeff[l] * bits
+        cut += offset
+        return cut
+
+    def _slice(self, chunk: int) -> slice:
+        return slice(chunk * self.chunk, (chunk + 1) * self.chunk)
+
+    def reset(self) -> None:
+        """Prepare |+>^n chunk by chunk."""
+        self._buffer.fill(1 / np.sqrt(self.state.size))
+        for chunk in range(self.chunks):
+            self.state[self._slice(chunk)] = self._buffer
+        self.state.flush()
+
+    def _chunk_pass(self, vec: np.ndarray, gamma: float = None, beta: float = None) -> None:
+        """Cost phase (if gamma is given) then the mixer on the local wires (if beta is given), one pass over the chunks."""
+        half = self.chunk // 2
+        if beta is not None:
+            c, s = self.dtype.type(np.cos(beta)), self.dtype.type(-1j * np.sin(beta))
+        for chunk in range(self.chunks):
+            sl = self._slice(chunk)
+            np.copyto(self._buffer, vec[sl])
+            if gamma is not None:
+                np.multiply(self.chunk_cut(chunk), -2j * gamma, out=self._work)
+                np.exp(self._work, out=self._work)
+                self._buffer *= self._work
+            if beta is not None:
+                for wire in range(self.chunk_qubits):
+                    psi = self._buffer.reshape(2 ** wire, 2, -1)
+                    a, b = psi[:, 0, :], psi[:, 1, :]
+                    _rotate(a, b, c, s, self._work[:half].reshape(a.shape), self._work[half:].reshape(a.shape))
+            vec[sl] = self._buffer
+
+    def _global_pass(self, vec: np.ndarray, beta: float) -> None:
+        """Mixer on the global wires, one blocked pass over pairs of chunks per wire."""
+        c, s = self.dtype.type(np.cos(beta)), self.dtype.type(-1j * np.sin(beta))
+        half = self.chunk // 2
+        for wire in range(self.global_qubits):
+            stride = 2 ** (self.global_qubits - 1 - wire)
+            for chunk in range(self.chunks):
+                if chunk & stride:
+                    continue
+                low, high = self._slice(chunk), self._slice(chunk | stride)
+                np.copyto(self._buffer, vec[low])
+                np.copyto(self._partner, vec[high])
+                for block in (slice(0, half), slice(half, self.chunk)):
+                    _rotate(self._buffer[block], self._partner[block], c, s, self._work[:half], self._work[half:])
+                vec[low] = self._buffer
+                vec[high] = self._partner
+
+    def apply_layer(self, gamma: float, beta: float) -> dict:
+        """
+        One QAOA layer: a fused cost + local-mixer pass over the chunks, then one pass over chunk
+        pairs per global wire.
+        :return: (dict) Seconds, bytes moved and GB/s of the layer.
+        """
+        start = time.perf_counter()
+        self._chunk_pass(self.state, gamma, beta)
+        self._global_pass(self.state, beta)
+        self.state.flush()
+
+        seconds = time.perf_counter() - start
+        moved = 2 * self.state.nbytes * (1 + self.global_qubits)  ### every pass reads and writes the file once
+        stats = {"seconds": seconds, "bytes": moved, "gb_per_s": moved / seconds / 1e9}
+        self.layer_stats.append(stats)
+        return stats
+
+    def run(self, params: np.ndarray) -> None:
+        """
+        Evolve |+>^n through the QAOA layers.
+        :param params: (np.ndarray) Array of shape (layers, 2) with rows (gamma, beta).
+        """
+        self.reset()
+        self.layer_stats = []
+        for gamma, beta in np.asarray(params, dtype=np.float64):
+            self.apply_layer(gamma, beta)
+
+    def _observable(self, observable: np.ndarray, chunk: int) -> np.ndarray:
+        return self.chunk_cut(chunk) if observable is None else observable[self._slice(chunk)]
+
+    def energy(self, params: np.ndarray, per_edge: bool = False, observable: np.ndarray = None):
+        """
+        MaxCut energy <psi|C|psi> accumulated chunk by chunk.
+        :param params: (np.ndarray) Array of shape (layers, 2) with rows (gamma, beta);
+        :param per_edge: (bool) Also return <Z_i Z_j> for every edge, in edge_arrays order;
+        :param observable: (np.ndarray) Diagonal of the measured observable (may be a memmap), defaults to the cut;
+        :return: (float) The energy, or (tuple) the energy and the per-edge expectations.
+        """
+        self.run(params)
+        energy = 0.0
+        for chunk in range(self.chunks):
+            np.copyto(self._buffer, self.state[self._slice(chunk)])
+            energy += float(np.dot(np.abs(self._buffer) ** 2, self._observable(observable, chunk)))
+        if not per_edge:
+            return energy
+        return energy, self.edge_expectations()
+
+    def _bits(self, chunk: int, node: int):
+        """Value of wire `node` over the chunk: a constant for a global wire, a vector for a local one."""
+        if node < self.global_qubits:
+            return self._global_bit(chunk, node)
+        return (self._index >> (self.qubits - 1 - node)) & 1
+
+    def edge_expectations(self) -> np.ndarray:
+        """<Z_i Z_j> of every edge of the current state, accumulated chunk by chunk."""
+        u, v, _ = edge_arrays(self.graph)
+        zz = np.zeros(len(u))
+        for chunk in range(self.chunks):
+            probs = np.abs(self.state[self._slice(chunk)]) ** 2
+            for k, (i, j) in enumerate(zip(u, v)):
+                different = self._bits(chunk, i) ^ self._bits(chunk, j)
+                zz[k] += float(np.sum(probs * (1 - 2 * different)))
+        return zz
+
+    def energy_and_grad(self, params: np.ndarray, observable: np.ndarray = None) -> tuple:
+        """
+        Energy and its gradient by adjoint differentiation, as QAOAStatevector.energy_and_grad, with lambda
+        in a second memory-mapped file. The generator terms <lambda|sum_k X_k|psi> and <lambda|C|psi> are
+        accumulated chunk by chunk (global wires over chunk pairs), so no generator vector is stored.
+        The walk back leaves self.state at |+>^n.
+        :param params: (np.ndarray) Array of shape (layers, 2) with rows (gamma, beta);
+        :param observable: (np.ndarray) Diagonal of the measured observable (may be a memmap), defaults to the cut;
+        :return: (tuple) The energy and the (layers, 2) array of d/dgamma, d/dbeta.
+        """
+        params = np.asarray(params, dtype=np.float64)
+        self.run(params)
+        psi, adjoint = self.state, self._adjoint_vector()
+        energy = 0.0
+        for chunk in range(self.chunks):
+            sl = self._slice(chunk)
+            np.multiply(psi[sl], self._observable(observable, chunk), out=self._buffer)
+            energy += float(np.vdot(psi[sl], self._buffer).real)
+            adjoint[sl] = self._buffer
+
+        grads = np.zeros_like(params)
+        for layer in range(len(params) - 1, -1, -1):
+            gamma, beta = params[layer]
+            grads[layer, 1] = 2 * self._mixer_generator_overlap(adjoint, psi).imag
+            for vec in (psi, adjoint):
+                self._chunk_pass(vec, beta=-beta)
+                self._global_pass(vec, -beta)
+            grads[layer, 0] = 4 * self._cost_generator_overlap(adjoint, psi).imag
+            for vec in (psi, adjoint):
+                self._chunk_pass(vec, gamma=-gamma)
+        self.state.flush()
+        return energy, grads
+
+    def _adjoint_vector(self) -> np.memmap:
+        if self._adjoint is None:
+            fd, self._adjoint_path = tempfile.mkstemp(suffix=".adjoint.amp", dir=os.path.dirname(os.path.abspath(self.path)))
+            os.close(fd)
+            self._adjoint = np.memmap(self._adjoint_path, dtype=self.dtype, mode="w+", shape=self.state.shape)
+        return self._adjoint
+
+    def _mixer_generator_overlap(self, bra: np.ndarray, ket: np.ndarray) -> complex:
+        """<bra|sum_k X_k|ket>: local wires inside each chunk, every global wire over its chunk pairs."""
+        overlap = 0j
+        for chunk in range(self.chunks):
+            sl = self._slice(chunk)
+            np.copyto(self._buffer, ket[sl])
+            np.copyto(self._partner, bra[sl])
+            for wire in range(self.chunk_qubits):
+                psi = self._buffer.reshape(2 ** wire, 2, -1)
+                lam = self._partner.reshape(2 ** wire, 2, -1)
+                overlap += np.vdot(lam[:, 0, :], psi[:, 1, :]) + np.vdot(lam[:, 1, :], psi[:, 0, :])
+        for wire in range(self.global_qubits):
+            stride = 2 ** (self.global_qubits - 1 - wire)
+            for chunk in range(self.chunks):
+                if chunk & stride:
+                    continue
+                low, high = self._slice(chunk), self._slice(chunk | stride)
+                overlap += np.vdot(bra[low], ket[high]) + np.vdot(bra[high], ket[low])
+        return overlap
+
+    def _cost_generator_overlap(self, bra: np.ndarray, ket: np.ndarray) -> complex:
+        """<bra|C|ket> chunk by chunk."""
+        overlap = 0j
+        for chunk in range(self.chunks):
+            sl = self._slice(chunk)
+            np.multiply(ket[sl], self.chunk_cut(chunk), out=self._buffer)
+            overlap += np.vdot(bra[sl], self._buffer)
+        return overlap
+
+    def sample(self, shots: int, seed: int = None) -> dict:
+        """
+        Sample the current state: shots are split between the chunks by their total probability,
+        then drawn inside each chunk.
+        :param shots: (int) Number of shots;
+        :param seed: (int) Seed of the random generator;
+        :return: (dict) Counts with the same bitstring keys as qml.counts().
+        """
+        rng = np.random.default_rng(seed)
+        weights = np.array([np.sum(np.abs(self.state[self._slice(chunk)]) ** 2) for chunk in range(self.chunks)])
+        per_chunk = rng.multinomial(shots, weights / weights.sum())
+        counts = {}
+        for chunk in np.flatnonzero(per_chunk):
+            probs = np.abs(self.state[self._slice(chunk)]) ** 2
+            hits = rng.multinomial(per_chunk[chunk], probs / probs.sum())
+            for k in np.flatnonzero(hits):
+                counts[format(int(chunk) * self.chunk + int(k), "0" + str(self.qubits) + "b")] = int(hits[k])
+        return counts
+
+    def close(self) -> None:
+        """Release the memory maps, remove the adjoint scratch file and the state file if it was created here."""
+        if not hasattr(self, "state"):
+            return
+        self.state.flush()
+        del self.state
+        if self._owned:
+            os.remove(self.path)
+        if self._adjoint is not None:
+            self._adjoint = None
+            os.remove(self._adjoint_path)
+
+    def __enter__(self) -> "MemmapQAOAStatevector":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,310 @@
+import weakref
+import threading
+import numpy as np
+import networkx as nx
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from cut_arrays import edge_arrays
+from qaoa_statevector import _rotate
+
+
+def shard_cut(graph: nx.Graph, qubits: int, start: int, size: int, dtype=np.float64, block: int = 2 ** 20) -> np.ndarray:
+    """
+    Entries start .. start + size - 1 of cut_vector, built block by block so that no index array
+    of the full shard size is needed.
+    :param graph: (nx.Graph) Graph with integer nodes, optionally weighted;
+    :param qubits: (int) Number of qubits;
+    :param start: (int) First basis state of the shard;
+    :param size: (int) Number of basis states;
+    :param dtype: Real dtype of the returned vector;
+    :param block: (int) Basis states per block;
+    :return: (np.ndarray) The cut values of the shard.
+    """
+    u, v, w = edge_arrays(graph)
+    cut = np.zeros(size, dtype=dtype)
+    for lo in range(0, size, block):
+        index = np.arange(start + lo, start + min(lo + block, size), dtype=np.int64)
+        part = cut[lo:lo + len(index)]
+        for i, j, weight in zip(u, v, w):
+            part -= weight * (((index >> (qubits - 1 - i)) ^ (index >> (qubits - 1 - j))) & 1)
+    return cut
+
+
+def _release(conns: list, workers: list, segments: list) -> None:
+    """Stop the workers and unlink the segments. Finaliser of ShardedQAOAStatevector, so it holds no reference to it."""
+    for conn in conns:
+        try:
+            conn.send(("close", ()))
+        except OSError:  ### the worker is already gone
+            pass
+    for worker in workers:
+        worker.join(timeout=10)
+        if worker.is_alive():
+            worker.terminate()
+            worker.join()
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:  ### an array on the segment is still referenced, unlinking is enough
+            pass
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ShardedQAOAStatevector:
+    """
+    QAOA statevector split over `shards` local worker processes, each owning 2**n / shards amplitudes
+    in a multiprocessing.shared_memory segment. Shard k holds the basis states whose top log2(shards)
+    wires spell k, so the cost phase and the mixer on the other wires are shard-local. A mixer wire among
+    the top ones pairs shard k with shard k ^ stride: between two barriers each of the two workers rotates
+    one half of the pair in both segments. Only fork and shared memory are used, no MPI.
+    energy_and_grad keeps the adjoint state in a second set of segments, allocated at its first call.
+    After a worker error the barrier is reset, so the engine stays usable once the state is re-run.
+    Use it in a with block (or call close()): the workers and the /dev/shm segments are released on exit,
+    on a failed construction and, as a last resort, when the engine is garbage collected.
+    """
+    def __init__(self, graph: nx.Graph, qubits: int = None, shards: int = 4, dtype=np.complex128) -> None:
+        self.graph = graph
+        self.qubits = graph.number_of_nodes() if qubits is None else qubits
+        self.dtype = np.dtype(dtype)
+        if shards < 1 or shards & (shards - 1) or shards > 2 ** (self.qubits - 1):
+            raise ValueError(f"shards={shards} must be a power of two not above 2**(qubits-1)")
+        self.shards = shards
+        self.shard_bits = shards.bit_length() - 1
+        self.size = 2 ** self.qubits // shards
+        self._segments, self._conns, self._workers = [], [], []  ### filled in place, so the finaliser sees every one
+        self._adjoint_segments = None
+        self._finalizer = weakref.finalize(self, _release, self._conns, self._workers, self._segments)
+        try:
+            for _ in range(shards):
+                self._segments.append(shared_memory.SharedMemory(create=True, size=self.size * self.dtype.itemsize))
+            self.state = [np.ndarray(self.size, dtype=self.dtype, buffer=segment.buf) for segment in self._segments]
+
+            ctx = mp.get_context("fork")  ### workers inherit the segments and the graph
+            self._barrier = ctx.Barrier(shards)
+            for rank in range(shards):
+                conn, child = ctx.Pipe()
+                worker = ctx.Process(target=self._serve, args=(rank, child), daemon=True)
+                worker.start()
+                self._conns.append(conn)
+                self._workers.append(worker)
+            self.reset()
+        except BaseException:
+            self.close()
+            raise
+
+    def _call(self, command: str, args: list = None) -> list:
+        """Send a command to every worker (with per-rank arguments if given) and gather the replies."""
+        for rank, conn in enumerate(self._conns):
+            conn.send((command, () if args is None else args[rank]))
+        replies = [conn.recv() for conn in self._conns]
+        errors = [reply for reply in replies if isinstance(reply, Exception)]
+        if errors:
+            self._barrier.reset()  ### every worker has replied, so none is waiting on it
+            cause = next((e for e in errors if not isinstance(e, threading.BrokenBarrierError)), errors[0])
+            raise RuntimeError(f"Worker failed on {command}") from cause
+        return replies
+
+    # ---- worker side ----
+
+    def _serve(self, rank: int, conn) -> None:
+        self._cut = shard_cut(self.graph, self.qubits, rank * self.size, self.size, np.finfo(self.dtype).dtype)
+        self._work = np.empty(self.size, dtype=self.dtype)
+        while True:
+            command, args = conn.recv()
+            if command == "close":
+                if self._adjoint_segments is not None:
+                    del self.adjoint
+                    for segment in self._adjoint_segments:
+                        segment.close()
+                break
+            try:
+                reply = getattr(self, "_worker_" + command)(rank, *args)
+            except Exception as error:
+                self._barrier.abort()  ### release the other workers instead of deadlocking
+                reply = error
+            conn.send(reply)
+        conn.close()
+
+    def _worker_reset(self, rank: int) -> None:
+        self.state[rank].fill(1 / np.sqrt(2 ** self.qubits))
+
+    def _worker_cost(self, rank: int, vec: np.ndarray, gamma: float) -> None:
+        work = self._work
+        np.multiply(self._cut, -2j * gamma, out=work)
+        np.exp(work, out=work)
+        vec *= work
+
+    def _worker_mix(self, rank: int, vecs: list, beta: float) -> None:
+        """RX(2 beta) on every wire of the shards `vecs` (state or adjoint), synchronised on the global wires."""
+        psi, work, half = vecs[rank], self._work, self.size // 2
+        c, s = self.dtype.type(np.cos(beta)), self.dtype.type(-1j * np.sin(beta))
+        for wire in range(self.qubits - self.shard_bits):
+            view = psi.reshape(2 ** wire, 2, -1)
+            a, b = view[:, 0, :], view[:, 1, :]
+            _rotate(a, b, c, s, work[half:].reshape(a.shape), work[:half].reshape(a.shape))
+        for wire in range(self.shard_bits):
+            self._barrier.wait()  ### the partner has finished its previous pass
+            partner = rank ^ 2 ** (self.shard_bits - 1 - wire)
+            low, high = min(rank, partner), max(rank, partner)
+            part = slice(0, half) if rank == low else slice(half, self.size)
+            _rotate(vecs[low][part], vecs[high][part], c, s, work[half:], work[:half])
+        if self.shard_bits:
+            self._barrier.wait()
+
+    def _worker_run(self, rank: int, params: np.ndarray) -> None:
+        self._worker_reset(rank)
+        for gamma, beta in params:
+            self._worker_cost(rank, self.state[rank], gamma)
+            self._worker_mix(rank, self.state, beta)
+
+    def _worker_attach(self, rank: int, names: list) -> None:
+        self._adjoint_segments = [shared_memory.SharedMemory(name=name) for name in names]
+        self.adjoint = [np.ndarray(self.size, dtype=self.dtype, buffer=segment.buf) for segment in self._adjoint_segments]
+        self._generator = np.empty(self.size, dtype=self.dtype)
+
+    def _worker_generator(self, rank: int) -> np.ndarray:
+        """This shard of sum_k X_k psi; the global wires read the partner shards."""
+        out, psi = self._generator, self.state[rank]
+        out.fill(0)
+        for wire in range(self.qubits - self.shard_bits):
+            view = psi.reshape(2 ** wire, 2, -1)
+            target = out.reshape(2 ** wire, 2, -1)
+            target[:, 0, :] += view[:, 1, :]
+            target[:, 1, :] += view[:, 0, :]
+        for wire in range(self.shard_bits):
+            out += self.state[rank ^ 2 ** (self.shard_bits - 1 - wire)]
+        return out
+
+    def _worker_energy_and_grad(self, rank: int, params: np.ndarray, observable: np.ndarray) -> tuple:
+        """Shard terms of QAOAStatevector.energy_and_grad: the vdots are summed by the caller."""
+        self._worker_run(rank, params)
+        psi, adjoint, generator = self.state[rank], self.adjoint[rank], self._generator
+        np.multiply(psi, self._cut if observable is None else observable, out=adjoint)
+        energy = float(np.vdot(psi, adjoint).real)
+        grads = np.zeros_like(params)
+        for layer in range(len(params) - 1, -1, -1):
+            gamma, beta = params[layer]
+            if self.shard_bits:
+                self._barrier.wait()  ### psi of the partners is final
+            self._worker_generator(rank)
+            grads[layer, 1] = 2 * np.vdot(adjoint, generator).imag
+            if self.shard_bits:
+                self._barrier.wait()  ### the partners have read this shard of psi
+            self._worker_mix(rank, self.state, -beta)
+            self._worker_mix(rank, self.adjoint, -beta)
+            np.multiply(psi, self._cut, out=generator)
+            grads[layer, 0] = 4 * np.vdot(adjoint, generator).imag
+            self._worker_cost(rank, psi, -gamma)
+            self._worker_cost(rank, adjoint, -gamma)
+        return energy, grads
+
+    def _worker_energy(self, rank: int, observable: np.ndarray = None) -> float:
+        return float(np.dot(np.abs(self.state[rank]) ** 2, self._cut if observable is None else observable))
+
+    def _worker_edges(self, rank: int, block: int = 2 ** 20) -> np.ndarray:
+        """This shard's share of <Z_i Z_j> for every edge, in edge_arrays order."""
+        u, v, _ = edge_arrays(self.graph)
+        zz = np.zeros(len(u))
+        for lo in range(0, self.size, block):
+            probs = np.abs(self.state[rank][lo:lo + block]) ** 2
+            index = np.arange(rank * self.size + lo, rank * self.size + lo + len(probs), dtype=np.int64)
+            for k, (i, j) in enumerate(zip(u, v)):
+                different = ((index >> (self.qubits - 1 - i)) ^ (index >> (self.qubits - 1 - j))) & 1
+                zz[k] += np.dot(probs, 1 - 2 * different)
+        return zz
+
+    def _worker_weight(self, rank: int) -> float:
+        return float(np.sum(np.abs(self.state[rank]) ** 2))
+
+    def _worker_sample(self, rank: int, shots: int, seed: int) -> tuple:
+        probs = np.abs(self.state[rank]) ** 2
+        hits = np.random.default_rng(seed).multinomial(shots, probs / probs.sum())
+        keys = np.flatnonzero(hits)
+        return keys + rank * self.size, hits[keys]
+
+    # ---- same API as QAOAStatevector ----
+
+    def reset(self) -> None:
+        """Prepare |+>^n on every shard."""
+        self._call("reset")
+
+    def run(self, params: np.ndarray) -> None:
+        """
+        Evolve |+>^n through the QAOA layers on all shards.
+        :param params: (np.ndarray) Array of shape (layers, 2) with rows (gamma, beta).
+        """
+        params = np.asarray(params, dtype=np.float64)
+        self._call("run", [(params,)] * self.shards)
+
+    def _shards_of(self, observable: np.ndarray) -> list:
+        """Per-rank arguments holding each worker's slice of a diagonal observable (None: the cut vector)."""
+        if observable is None:
+            return [(None,)] * self.shards
+        observable = np.asarray(observable)
+        return [(observable[rank * self.size:(rank + 1) * self.size],) for rank in range(self.shards)]
+
+    def energy(self, params: np.ndarray, per_edge: bool = False, observable: np.ndarray = None):
+        """
+        MaxCut energy <psi|C|psi>, reduced over the shards.
+        :param params: (np.ndarray) Array of shape (layers, 2) with rows (gamma, beta);
+        :param per_edge: (bool) Also return <Z_i Z_j> for every edge, in edge_arrays order;
+        :param observable: (np.ndarray) Diagonal of the measured observable, defaults to the cut vector;
+        :return: (float) The energy, or (tuple) the energy and the per-edge expectations.
+        """
+        self.run(params)
+        energy = float(sum(self._call("energy", self._shards_of(observable))))
+        if not per_edge:
+            return energy
+        return energy, np.sum(self._call("edges"), axis=0)
+
+    def energy_and_grad(self, params: np.ndarray, observable: np.ndarray = None) -> tuple:
+        """
+        Energy and its gradient by adjoint differentiation, as QAOAStatevector.energy_and_grad with
+        every shard walking its part of psi and lambda back. Leaves the state at |+>^n.
+        :param params: (np.ndarray) Array of shape (layers, 2) with rows (gamma, beta);
+        :param observable: (np.ndarray) Diagonal of the measured observable, defaults to the cut vector;
+        :return: (tuple) The energy and the (layers, 2) array of d/dgamma, d/dbeta.
+        """
+        params = np.asarray(params, dtype=np.float64)
+        if self._adjoint_segments is None:
+            segments = []
+            for _ in range(self.shards):
+                segments.append(shared_memory.SharedMemory(create=True, size=self.size * self.dtype.itemsize))
+                self._segments.append(segments[-1])  ### released by close() even if the attach fails
+            self._call("attach", [([segment.name for segment in segments],)] * self.shards)
+            self._adjoint_segments = segments
+        replies = self._call("energy_and_grad", [(params, obs) for (obs,) in self._shards_of(observable)])
+        return float(sum(e for e, _ in replies)), np.sum([g for _, g in replies], axis=0)
+
+    def sample(self, shots: int, seed: int = None) -> dict:
+        """
+        Sample the current state: shots are split between the shards by their total probability,
+        then drawn inside each shard.
+        :param shots: (int) Number of shots;
+        :param seed: (int) Seed of the random generator;
+        :return: (dict) Counts with the same bitstring keys as qml.counts().
+        """
+        rng = np.random.default_rng(seed)
+        weights = np.array(self._call("weight"))
+        per_shard = rng.multinomial(shots, weights / weights.sum())
+        seeds = rng.integers(2 ** 32, size=self.shards)
+        counts = {}
+        for keys, hits in self._call("sample", [(int(n), int(s)) for n, s in zip(per_shard, seeds)]):
+            for k, hit in zip(keys, hits):
+                counts[format(int(k), "0" + str(self.qubits) + "b")] = int(hit)
+        return counts
+
+    def close(self) -> None:
+        """Stop the workers and free the shared-memory segments; calling it again does nothing."""
+        if hasattr(self, "state"):
+            del self.state
+        self._finalizer()
+
+    def __enter__(self) -> "ShardedQAOAStatevector":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
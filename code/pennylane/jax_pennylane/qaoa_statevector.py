@@ -0,0 +1,388 @@
+import os
+import numpy as np
+import networkx as nx
+from concurrent.futures import ThreadPoolExecutor
+from cut_arrays import edge_arrays
+
+
+def cut_vector(graph: nx.Graph, qubits: int = None, dtype=np.float64, half: bool = False) -> np.ndarray:
+    """
+    Diagonal of the MaxCut cost C = -sum_(i,j) w_ij [z_i != z_j] over the computational basis.
+    Wire 0 is the most significant bit, as in PennyLane, so cut[k] is maxcut_obj of format(k, "0nb").
+    :param graph: (nx.Graph) Graph with integer nodes, optionally weighted;
+    :param qubits: (int) Number of qubits, defaults to the number of nodes;
+    :param dtype: Real dtype of the returned vector;
+    :param half: (bool) Only the first 2**(qubits-1) entries, i.e. the bitstrings with wire 0 in |0>;
+    :return: (np.ndarray) Vector of 2**qubits cut values.
+    """
+    if qubits is None:
+        qubits = graph.number_of_nodes()
+    u, v, w = edge_arrays(graph)
+    size = 2 ** (qubits - 1) if half else 2 ** qubits
+    index = np.arange(size, dtype=np.int64)
+    cut = np.zeros(size, dtype=dtype)
+    for i, j, weight in zip(u, v, w):
+        different = ((index >> (qubits - 1 - i)) ^ (index >> (qubits - 1 - j))) & 1
+        cut -= weight * different
+    return cut
+
+
+def _rotate(a: np.ndarray, b: np.ndarray, c, s, sa: np.ndarray, sb: np.ndarray) -> None:
+    """(a, b) <- (c a + s b, s a + c b) in place, with sa and sb as scratch of the same shape."""
+    np.multiply(b, s, out=sb)
+    np.multiply(a, s, out=sa)
+    a *= c
+    a += sb
+    b *= c
+    b += sa
+
+
+class QAOAStatevector:
+    """
+    Native statevector simulator of the QAOA ansatz used in GammaCircuit/BetaCircuit.
+    The cost layer exp(-i gamma sum w Z_i Z_j) is applied as one elementwise phase multiply
+    with the cut vector precomputed once per graph (equal to the CNOT-RZ-CNOT ladder up to a global phase).
+    """
+    def __init__(self, graph: nx.Graph, qubits: int = None, dtype=np.complex128) -> None:
+        self.graph = graph
+        self.qubits = graph.number_of_nodes() if qubits is None else qubits
+        self.dtype = np.dtype(dtype)
+        self.cut = cut_vector(graph, self.qubits, dtype=np.finfo(self.dtype).dtype)
+        self.state = np.empty(2 ** self.qubits, dtype=self.dtype)
+        self._work = np.empty_like(self.state)  ### phase buffer of the cost layer, two half buffers for the mixer
+        self._adjoint, self._generator = None, None  ### allocated by the first energy_and_grad call
+        self.reset()
+
+    def reset(self) -> np.ndarray:
+        """Prepare |+>^n, i.e. the Hadamard layer."""
+        self.state.fill(1 / np.sqrt(self.state.size))
+        return self.state
+
+    def apply_cost(self, gamma: float) -> np.ndarray:
+        return self._apply_cost(self.state, gamma)
+
+    def apply_mixer(self, beta: float) -> np.ndarray:
+        return self._apply_mixer(self.state, beta)
+
+    def _apply_cost(self, vec: np.ndarray, gamma: float) -> np.ndarray:
+        np.multiply(self.cut, -2j * gamma, out=self._work)
+        np.exp(self._work, out=self._work)
+        vec *= self._work
+        return vec
+
+    def _apply_mixer(self, vec: np.ndarray, beta: float) -> np.ndarray:
+        """
+        exp(-i beta sum_k X_k) in place: one 2x2 contraction per axis of the (2,)*n tensor,
+        using the halves of the work buffer so that no state-sized array is allocated.
+        """
+        c, s = self.dtype.type(np.cos(beta)), self.dtype.type(-1j * np.sin(beta))
+        half = vec.size // 2
+        for wire in range(vec.size.bit_length() - 1):
+            psi = vec.reshape(2 ** wire, 2, -1)
+            a, b = psi[:, 0, :], psi[:, 1, :]
+            _rotate(a, b, c, s, self._work[half:].reshape(a.shape), self._work[:half].reshape(a.shape))
+        return vec
+
+    def run(self, params: np.ndarray) -> np.ndarray:
+        """
+        Evolve |+>^n through the QAOA layers.
+        :param params: (np.ndarray) Array of shape (layers, 2) with rows (gamma, beta);
+        :return: (np.ndarray) The final statevector.
+        """
+        self.reset()
+        for gamma, beta in np.asarray(params, dtype=np.float64):
+            self.apply_cost(gamma)
+            self.apply_mixer(beta)
+        return self.state
+
+    def probabilities(self) -> np.ndarray:
+        return np.abs(self.state) ** 2
+
+    def energy(self, params: np.ndarray, per_edge: bool = False, observable: np.ndarray = None):
+        """
+        MaxCut energy <psi|C|psi> = p . cut from a single simulation, i.e. the sum over edges of
+        -0.5 * w * (1 - <Z_i Z_j>) that the scripts used to build from one QNode run per edge.
+        :param params: (np.ndarray) Array of shape (layers, 2) with rows (gamma, beta);
+        :param per_edge: (bool) Also return <Z_i Z_j> for every edge, in edge_arrays order;
+        :param observable: (np.ndarray) Diagonal of the measured observable, defaults to the cut vector;
+        :return: (float) The energy, or (tuple) the energy and the per-edge expectations.
+        """
+        if observable is None:
+            observable = self.cut
+        self.run(params)
+        np.multiply(self.state, observable, out=self._work)
+        energy = float(np.vdot(self.state, self._work).real)
+        if not per_edge:
+            return energy
+        return energy, self.edge_expectations()
+
+    def energy_and_grad(self, params: np.ndarray, observable: np.ndarray = None) -> tuple:
+        """
+        Energy and its gradient by adjoint differentiation: after the forward pass the state and
+        lambda = O|psi> are walked back through the layers, so the memory stays at three extra
+        statevectors (lambda, the generator buffer and the work buffer) for any number of layers.
+        The walk back leaves self.state at |+>^n.
+        :param params: (np.ndarray) Array of shape (layers, 2) with rows (gamma, beta);
+        :param observable: (np.ndarray) Diagonal of the measured observable, defaults to the cut vector;
+        :return: (tuple) The energy and the (layers, 2) array of d/dgamma, d/dbeta.
+        """
+        params = np.asarray(params, dtype=np.float64)
+        if observable is None:
+            observable = self.cut
+        psi = self.run(params)
+        if self._adjoint is None:
+            self._adjoint = np.empty_like(self.state)
+            self._generator = np.empty_like(self.state)
+        adjoint, generator = self._adjoint, self._generator
+        np.multiply(psi, observable, out=adjoint)
+        energy = float(np.vdot(psi, adjoint).real)
+
+        grads = np.zeros_like(params)
+        for layer in range(len(params) - 1, -1, -1):
+            gamma, beta = params[layer]
+            self._mixer_generator(psi, generator)
+            grads[layer, 1] = 2 * np.vdot(adjoint, generator).imag
+            self._apply_mixer(psi, -beta)
+            self._apply_mixer(adjoint, -beta)
+            np.multiply(psi, self.cut, out=generator)
+            grads[layer, 0] = 4 * np.vdot(adjoint, generator).imag
+            self._apply_cost(psi, -gamma)
+            self._apply_cost(adjoint, -gamma)
+        return energy, grads
+
+    def _mixer_generator(self, vec: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """out = sum_k X_k vec."""
+        out.fill(0)
+        for wire in range(vec.size.bit_length() - 1):
+            psi = vec.reshape(2 ** wire, 2, -1)
+            target = out.reshape(2 ** wire, 2, -1)
+            target[:, 0, :] += psi[:, 1, :]
+            target[:, 1, :] += psi[:, 0, :]
+        return out
+
+    def edge_expectations(self, probs: np.ndarray = None) -> np.ndarray:
+        """<Z_i Z_j> of every edge from the two-qubit marginals of the current state."""
+        if probs is None:
+            probs = self.probabilities()
+        tensor = probs.reshape((2,) * self.qubits)
+        u, v, _ = edge_arrays(self.graph)
+        zz = np.empty(len(u))
+        for k, (i, j) in enumerate(zip(u, v)):
+            axes = tuple(a for a in range(self.qubits) if a != i and a != j)
+            marginal = tensor.sum(axis=axes)
+            zz[k] = marginal[0, 0] + marginal[1, 1] - marginal[0, 1] - marginal[1, 0]
+        return zz
+
+    def sample(self, shots: int, seed: int = None) -> dict:
+        """
+        Sample the current state.
+        :param shots: (int) Number of shots;
+        :param seed: (int) Seed of the random generator;
+        :return: (dict) Counts with the same bitstring keys as qml.counts().
+        """
+        probs = self.probabilities().astype(np.float64)
+        hits = np.random.default_rng(seed).multinomial(shots, probs / probs.sum())
+        keys = np.flatnonzero(hits)
+        return {format(k, "0" + str(self.qubits) + "b"): int(hits[k]) for k in keys}
+
+    def close(self) -> None:
+        """Release the resources of the engine (nothing to release here)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SymmetricQAOAStatevector(QAOAStatevector):
+    """
+    QAOAStatevector restricted to the Z2 symmetric subspace. The cut is invariant under flipping
+    every bit, |+>^n is symmetric and the X mixer preserves the symmetry, so psi(z) = psi(~z) and only
+    the 2**(n-1) amplitudes with wire 0 in |0> are stored. On that half X_0 acts as the flip of all
+    other bits, i.e. the reversal of the reduced vector.
+    """
+    def __init__(self, graph: nx.Graph, qubits: int = None, dtype=np.complex128) -> None:
+        self.graph = graph
+        self.qubits = graph.number_of_nodes() if qubits is None else qubits
+        self.dtype = np.dtype(dtype)
+        self.cut = cut_vector(graph, self.qubits, dtype=np.finfo(self.dtype).dtype, half=True)
+        self.state = np.empty(2 ** (self.qubits - 1), dtype=self.dtype)
+        self._work = np.empty_like(self.state)
+        self._adjoint, self._generator = None, None
+        self.reset()
+
+    def _apply_mixer(self, vec: np.ndarray, beta: float) -> np.ndarray:
+        super()._apply_mixer(vec, beta)  ### wires 1..n-1 are the axes of the reduced tensor
+        c, s = self.dtype.type(np.cos(beta)), self.dtype.type(-1j * np.sin(beta))
+        np.multiply(vec[::-1], s, out=self._work)
+        vec *= c
+        vec += self._work
+        return vec
+
+    def _mixer_generator(self, vec: np.ndarray, out: np.ndarray) -> np.ndarray:
+        super()._mixer_generator(vec, out)
+        out += vec[::-1]
+        return out
+
+    def edge_expectations(self, probs: np.ndarray = None) -> np.ndarray:
+        """<Z_i Z_j> of every edge; Z_0 is +1 on the stored half."""
+        if probs is None:
+            probs = self.probabilities()
+        tensor = probs.reshape((2,) * (self.qubits - 1))
+        u, v, _ = edge_arrays(self.graph)
+        zz = np.empty(len(u))
+        for k, (i, j) in enumerate(zip(u, v)):
+            wires = [x - 1 for x in (i, j) if x != 0]
+            axes = tuple(a for a in range(self.qubits - 1) if a not in wires)
+            marginal = tensor.sum(axis=axes)
+            if len(wires) == 1:
+                zz[k] = marginal[0] - marginal[1]
+            else:
+                zz[k] = marginal[0, 0] + marginal[1, 1] - marginal[0, 1] - marginal[1, 0]
+        return zz
+
+    def sample(self, shots: int, seed: int = None) -> dict:
+        """
+        Sample the stored half, then send each shot to z or ~z with probability 1/2.
+        :param shots: (int) Number of shots;
+        :param seed: (int) Seed of the random generator;
+        :return: (dict) Counts with the same bitstring keys as qml.counts().
+        """
+        rng = np.random.default_rng(seed)
+        probs = self.probabilities().astype(np.float64)
+        hits = rng.multinomial(shots, probs / probs.sum())
+        keys = np.flatnonzero(hits)
+        flipped = rng.binomial(hits[keys], 0.5)
+        width, mask = "0" + str(self.qubits) + "b", 2 ** self.qubits - 1
+        counts = {}
+        for key, hit, flip in zip(keys, hits[keys], flipped):
+            if hit > flip:
+                counts[format(key, width)] = int(hit - flip)
+            if flip:
+                counts[format(key ^ mask, width)] = int(flip)
+        return counts
+
+
+class ThreadedQAOAStatevector(QAOAStatevector):
+    """
+    QAOAStatevector with the cost and mixer passes split over a thread pool. The state is cut into
+    2**block_bits contiguous blocks: the cost phase and the mixer on the low wires are block-local,
+    and each of the top block_bits wires pairs whole blocks. NumPy ufuncs release the GIL on these
+    arrays, so the blocks run in parallel.
+    """
+    def __init__(self, graph: nx.Graph, qubits: int = None, dtype=np.complex128, threads: int = None) -> None:
+        super().__init__(graph, qubits, dtype)
+        self.threads = os.cpu_count() if threads is None else threads
+        self.block_bits = min((4 * self.threads - 1).bit_length(), self.qubits - 1)  ### ~4 blocks per thread
+        self._pool = ThreadPoolExecutor(max_workers=self.threads)
+
+    def close(self) -> None:
+        """Shut the thread pool down."""
+        self._pool.shutdown()
+
+    def _map(self, task, items) -> None:
+        list(self._pool.map(task, items))  ### re-raises the exceptions of the workers
+
+    def _blocks(self, vec: np.ndarray) -> np.ndarray:
+        return vec.reshape(2 ** self.block_bits, -1)
+
+    def _apply_cost(self, vec: np.ndarray, gamma: float) -> np.ndarray:
+        rows, cut, work = self._blocks(vec), self._blocks(self.cut), self._blocks(self._work)
+
+        def task(k):
+            np.multiply(cut[k], -2j * gamma, out=work[k])
+            np.exp(work[k], out=work[k])
+            rows[k] *= work[k]
+        self._map(task, range(len(rows)))
+        return vec
+
+    def _apply_mixer(self, vec: np.ndarray, beta: float) -> np.ndarray:
+        c, s = self.dtype.type(np.cos(beta)), self.dtype.type(-1j * np.sin(beta))
+        rows, work = self._blocks(vec), self._blocks(self._work)
+        half = rows.shape[1] // 2
+
+        def local_task(k):
+            for wire in range(self.qubits - self.block_bits):
+                psi = rows[k].reshape(2 ** wire, 2, -1)
+                a, b = psi[:, 0, :], psi[:, 1, :]
+                _rotate(a, b, c, s, work[k, half:].reshape(a.shape), work[k, :half].reshape(a.shape))
+        self._map(local_task, range(len(rows)))
+
+        for wire in range(self.block_bits):
+            stride = 2 ** (self.block_bits - 1 - wire)
+
+            def pair_task(k):
+                _rotate(rows[k], rows[k | stride], c, s, work[k | stride], work[k])
+            self._map(pair_task, [k for k in range(len(rows)) if not k & stride])
+        return vec
+
+    def _mixer_generator(self, vec: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """out = sum_k X_k vec, one task per output block."""
+        rows, target = self._blocks(vec), self._blocks(out)
+
+        def task(k):
+            target[k].fill(0)
+            for wire in range(self.qubits - self.block_bits):
+                psi = rows[k].reshape(2 ** wire, 2, -1)
+                t = target[k].reshape(2 ** wire, 2, -1)
+                t[:, 0, :] += psi[:, 1, :]
+                t[:, 1, :] += psi[:, 0, :]
+            for wire in range(self.block_bits):
+                target[k] += rows[k ^ 2 ** wire]
+        self._map(task, range(len(rows)))
+        return out
+
+
+class PrecisionPolicy:
+    """
+    Runs the optimisation in single precision (complex64 state, float32 parameters) and guards the
+    stopping test: whenever an energy change falls below `threshold` both energies are re-evaluated
+    in complex128, so rounding noise cannot fake (or hide) convergence.
+    """
+    def __init__(self, graph: nx.Graph, threshold: float, qubits: int = None, dtype=np.complex64,
+                 engine=QAOAStatevector) -> None:
+        self.graph = graph
+        self.qubits = qubits
+        self.threshold = threshold
+        self.engine = engine(graph, qubits, dtype=dtype)
+        self._engine_cls = engine
+        self._reference = None  ### complex128 twin, built at the first check
+        self.checks = 0
+
+    def _params(self, params: np.ndarray) -> np.ndarray:
+        return np.asarray(params, dtype=np.float32)
+
+    def energy(self, params: np.ndarray, per_edge: bool = False):
+        return self.engine.energy(self._params(params), per_edge=per_edge)
+
+    def energy_and_grad(self, params: np.ndarray) -> tuple:
+        return self.engine.energy_and_grad(self._params(params))
+
+    def confirm(self, prev_params: np.ndarray, params: np.ndarray, prev_value: float, value: float) -> tuple:
+        """
+        Energies to use in the convergence test.
+        :param prev_params: (np.ndarray) Parameters before the update;
+        :param params: (np.ndarray) Parameters after the update;
+        :param prev_value: (float) Single-precision energy of prev_params;
+        :param value: (float) Single-precision energy of params;
+        :return: (tuple) The two energies, re-evaluated in complex128 if their change is below threshold.
+        """
+        if abs(prev_value - value) >= self.threshold or self.engine.dtype == np.complex128:
+            return prev_value, value
+        if self._reference is None:
+            self._reference = self._engine_cls(self.graph, self.qubits, dtype=np.complex128)
+        self.checks += 1
+        return self._reference.energy(self._params(prev_params)), self._reference.energy(self._params(params))
+
+    def close(self) -> None:
+        """Close the single-precision engine and its complex128 twin (thread pools of ThreadedQAOAStatevector)."""
+        self.engine.close()
+        if self._reference is not None:
+            self._reference.close()
+
+    def __enter__(self) -> "PrecisionPolicy":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
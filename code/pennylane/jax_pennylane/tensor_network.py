@@ -0,0 +1,169 @@
+import numpy as np
+import networkx as nx
+from collections import defaultdict, OrderedDict
+from lightcone import light_cone, LightConeCache
+
+
+_path_cache = OrderedDict()  ### LRU of contraction orders, keyed by the index structure of the network
+_path_cache_size = 256
+
+
+def cached_path(inputs: list) -> list:
+    """greedy_path of a network, memoised in a bounded LRU."""
+    signature = tuple(inputs)
+    if signature in _path_cache:
+        _path_cache.move_to_end(signature)
+    else:
+        _path_cache[signature] = greedy_path(inputs)
+        while len(_path_cache) > _path_cache_size:
+            _path_cache.popitem(last=False)
+    return _path_cache[signature]
+
+
+def greedy_path(inputs: list, output: tuple = ()) -> list:
+    """
+    Greedy pairwise contraction order for a network of qubit (dimension 2) indices: at every
+    step contract the pair sharing an index whose result grows the network the least.
+    Indices shared by more than two tensors (the diagonal ZZ phases) are summed when their last holder goes.
+    :param inputs: (list) Index tuple of every tensor;
+    :param output: (tuple) Indices left open in the result;
+    :return: (list) Steps (a, b, result_id, result_indices), ids counting on from len(inputs).
+    """
+    tensors = {k: frozenset(ix) for k, ix in enumerate(inputs)}
+    holders = defaultdict(set)
+    for k, ix in tensors.items():
+        for i in ix:
+            holders[i].add(k)
+    keep = set(output)
+
+    def result_of(a, b):
+        return frozenset(i for i in tensors[a] | tensors[b] if i in keep or holders[i] - {a, b})
+
+    path, next_id = [], len(inputs)
+    while len(tensors) > 1:
+        best, best_cost = None, None
+        seen = set()
+        for hs in holders.values():
+            hs = sorted(hs)
+            for x in range(len(hs)):
+                for b in hs[x + 1:]:
+                    if (hs[x], b) in seen:
+                        continue
+                    seen.add((hs[x], b))
+                    r = result_of(hs[x], b)
+                    cost = (2 ** len(r) - 2 ** len(tensors[hs[x]]) - 2 ** len(tensors[b]), len(r))
+                    if best_cost is None or cost < best_cost:
+                        best, best_cost = (hs[x], b), cost
+        if best is None:  ### disconnected pieces: outer product of the two smallest
+            best = tuple(sorted(tensors, key=lambda k: len(tensors[k]))[:2])
+        a, b = best
+        r = result_of(a, b)
+        for i in tensors[a] | tensors[b]:
+            holders[i] -= {a, b}
+            if i in r:
+                holders[i].add(next_id)
+            elif not holders[i]:
+                del holders[i]
+        del tensors[a], tensors[b]
+        tensors[next_id] = r
+        path.append((a, b, next_id, tuple(sorted(r))))
+        next_id += 1
+    return path
+
+
+def contract(arrays: list, inputs: list, path: list) -> np.ndarray:
+    """
+    Run a contraction path from greedy_path with one np.einsum per pairwise step. Indices are renumbered
+    per step for the integer-sublist form, so only the indices of the two tensors count towards its 52.
+    """
+    pool = {k: (arrays[k], tuple(ix)) for k, ix in enumerate(inputs)}
+    for a, b, result_id, result_ix in path:
+        (x, ix_a), (y, ix_b) = pool.pop(a), pool.pop(b)
+        local = {i: n for n, i in enumerate(dict.fromkeys(ix_a + ix_b))}
+        pool[result_id] = (np.einsum(x, [local[i] for i in ix_a], y, [local[i] for i in ix_b],
+                                     [local[i] for i in result_ix]), result_ix)
+    (value, _), = pool.values()
+    return value
+
+
+class ConeNetwork:
+    """
+    <psi|Z_0 Z_1|psi> of a light cone as a tensor network mirroring GammaCircuit/BetaCircuit:
+    |+> vectors, one diagonal exp(-i gamma w Z Z) tensor per edge and layer, one RX(2 beta) per qubit
+    and layer, the Z_0 Z_1 observable and the conjugate network. Only the values change with the parameters.
+    """
+    def __init__(self, sub: nx.Graph, layers: int) -> None:
+        self.qubits = sub.number_of_nodes()
+        self.layers = layers
+        self.edges = sorted((min(i, j), max(i, j), w) for i, j, w in sub.edges.data("weight", default=1.0))
+        inputs, kinds = [], []
+        for side in (0, 1):  ### ket, bra
+            for k in range(self.qubits):
+                inputs.append((self._index(k, 0, side),))
+                kinds.append(("plus", side))
+            for t in range(layers):
+                for i, j, w in self.edges:
+                    inputs.append((self._index(i, t, side), self._index(j, t, side)))
+                    kinds.append(("cost", side, t, w))
+                for k in range(self.qubits):
+                    inputs.append((self._index(k, t + 1, side), self._index(k, t, side)))
+                    kinds.append(("mix", side, t))
+        for k in (0, 1):
+            inputs.append((self._index(k, layers, 0),))
+            kinds.append(("z",))
+        self.inputs, self.kinds = inputs, kinds
+        self.path = cached_path(inputs)
+
+    def _index(self, qubit: int, t: int, side: int) -> int:
+        """Index of a qubit after t layers; ket and bra share the indices after the last layer."""
+        if t == self.layers:
+            side = 0
+        return (side * (self.layers + 1) + t) * self.qubits + qubit
+
+    def arrays(self, params: np.ndarray) -> list:
+        zz = np.array([[1, -1], [-1, 1]])
+        arrays = []
+        for kind in self.kinds:
+            if kind[0] == "plus":
+                arrays.append(np.full(2, 1 / np.sqrt(2), dtype=np.complex128))
+            elif kind[0] == "cost":
+                _, side, t, w = kind
+                phase = np.exp(-1j * params[t, 0] * w * zz)
+                arrays.append(phase.conj() if side else phase)
+            elif kind[0] == "mix":
+                _, side, t = kind
+                c, s = np.cos(params[t, 1]), -1j * np.sin(params[t, 1])
+                rx = np.array([[c, s], [s, c]])
+                arrays.append(rx.conj() if side else rx)
+            else:
+                arrays.append(np.array([1.0, -1.0], dtype=np.complex128))
+        return arrays
+
+    def expectation(self, params: np.ndarray) -> float:
+        params = np.asarray(params, dtype=np.float64)
+        return float(contract(self.arrays(params), self.inputs, self.path).real)
+
+
+class TensorNetworkSimulator:
+    """
+    MaxCut energy of the QAOA ansatz by tensor-network contraction of every edge's light cone.
+    Contraction orders are searched once per graph and depth and reused at every parameter update,
+    so memory follows the width of the contraction instead of 2^n. Isomorphic cones are relabelled onto
+    one representative so that they share a path; the class table is local to the constructor.
+    """
+    def __init__(self, graph: nx.Graph, layers: int) -> None:
+        self.graph = graph
+        self.layers = layers
+        self.edges = list(graph.edges.data("weight", default=1.0))
+        cones = [light_cone(graph, (u, v), layers)[1] for u, v, _ in self.edges]
+        classes = LightConeCache()
+        self.networks = [ConeNetwork(classes.canonical_form(sub, weighted=False)[1], layers) for sub in cones]
+
+    def edge_expectations(self, params: np.ndarray) -> np.ndarray:
+        """<Z_u Z_v> of every edge, in graph.edges order."""
+        return np.array([network.expectation(params) for network in self.networks])
+
+    def energy(self, params: np.ndarray) -> float:
+        zz = self.edge_expectations(params)
+        w = np.array([e[2] for e in self.edges])
+        return float(np.sum(-0.5 * w * (1 - zz)))
@@ -1,7 +1,8 @@
 from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister
 import networkx as nx
 import qiskit_aer as q_aer
-from utilities import execution, invert_counts
+from utilities import execution
+from counts import Counts
 from maxcut import *
 import numpy as np
 from scipy.optimize import minimize
@@ -19,7 +20,7 @@ def get_objective(p, G):
         gamma_extracted = theta[p:]
         qaoa_circuit = qaoa.merged_qaoa_circuit(beta=beta_extracted, gamma=gamma_extracted)
         counts = execution(circuit=qaoa_circuit, backend=backend, shots=shots)
-        return compute_energy(invert_counts(counts=counts), G)
+        return Counts.from_qiskit(counts).evaluate(G, weighted=False)[0]
     return f
 
 
@@ -1,13 +1,16 @@
 from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister
 import networkx as nx
 import qiskit_aer as q_aer
-from utilities import execution, invert_counts
+from utilities import execution
+from counts import Counts
+from circuit_QAOA import QAOATemplate
 from maxcut import *
 import numpy as np
 from scipy.optimize import minimize
 from RandomGraphGeneration import RandomGraph, plot
 import matplotlib.pyplot as plt
 import sys
+from ground_truth import ground_truth
 
 
 shots = 10_000
@@ -75,15 +78,19 @@ class QAOA:
         return qc
 
 
+def linear_schedule(intercept: float, slope: float) -> np.ndarray:
+    """Per-layer values intercept + slope * i / layers, as in QAOA.merged_qaoa_circuit."""
+    return intercept + slope * np.arange(layers) / layers
+
+
 def objective_function(G):
+    template = QAOATemplate(graph=G, layers=layers, backend=backend)
     def f(theta):
         gi, gs, bi, bs = theta
-        qaoa = QAOA(graph = G)
-        qaoa_circuit = qaoa.merged_qaoa_circuit(gamma_intercept=gi, gamma_slope=gs, beta_intercept=bi, beta_slope=bs)
-        counts = execution(circuit=qaoa_circuit, backend=backend, shots=shots)
-        return compute_energy(invert_counts(counts=counts), G)
+        counts = template.run(gamma=linear_schedule(gi, gs), beta=linear_schedule(bi, bs), shots=shots)
+        return Counts.from_qiskit(counts).evaluate(G, weighted=False)[0]
     return f
-    #return compute_energy(invert_counts(counts=counts), G)
+    #return Counts.from_qiskit(counts).evaluate(G, weighted=False)[0]
 
 
 
@@ -112,6 +119,8 @@ if __name__ == "__main__":
         g = RandomGraph(4,0.5,8888)
         sol = solve(graph=g, maxiter=1000)
         print("Solution:", sol)
+        min_energy, _ = ground_truth(g)
+        print("Approx. ratio:", sol["fun"] / min_energy)
     
     elif sys.argv[1] == "plot":
         g = RandomGraph(4,0.5,8888)
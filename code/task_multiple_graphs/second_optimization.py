@@ -4,7 +4,8 @@ import networkx as nx
 import numpy as np
 import matplotlib.pyplot as plt
 from circuit_QAOA import QAOA_circuit
-from utilities import execution, invert_counts
+from utilities import execution
+from counts import Counts
 from maxcut import *
 from scipy.optimize import minimize
 
@@ -79,7 +80,7 @@ def get_objective(p, G):
         counts = execution(circuit=qc_DQAOA, backend=backend, shots=shots)
         print("Beta and gamm already optmized:", old_beta_gamma)
         #print("Energy -- :", e)
-        return compute_energy(invert_counts(counts=counts), G)
+        return Counts.from_qiskit(counts).evaluate(G, weighted=False)[0]
     return f
 
 
@@ -108,7 +109,7 @@ def Old_QAOA(beta_opt: list,
     # Measurement 
     new_quantum_circuit.measure(range(qbits), range(qbits))
     counts = execution(new_quantum_circuit, backend, shots)
-    energy = compute_energy(invert_counts(counts=counts), G)
+    energy = Counts.from_qiskit(counts).evaluate(G, weighted=False)[0]
     return energy
 
 
@@ -122,6 +123,6 @@ print("Absolute difference E_new - E_old:", np.abs(new_energy_sol-energy_optimiz
 
 qc, _ = DeepQAOA(beta_opt=opt_beta, gamma_opt=opt_gamma, G=G2, new_beta=new_solution[:new_layers], new_gama=new_solution[new_layers:])
 kounts = execution(qc, backend, shots)
-print("Energy with ALL OPTIMIZED params:", compute_energy(invert_counts(counts=kounts), G2))
+print("Energy with ALL OPTIMIZED params:", Counts.from_qiskit(kounts).evaluate(G2, weighted=False)[0])
 
 
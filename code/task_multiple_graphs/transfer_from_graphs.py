@@ -1,7 +1,8 @@
 from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister
 import networkx as nx
 import qiskit_aer as q_aer
-from utilities import execution, invert_counts
+from utilities import execution
+from counts import Counts
 from maxcut import *
 import numpy as np
 from scipy.optimize import minimize
@@ -10,7 +11,7 @@ import matplotlib.pyplot as plt
 import sys
 import time
 from linear_beta_gamma import QAOA, objective_function
-from maxcut import compute_energy
+from ground_truth import ground_truth
 
 
 seed = 88
@@ -50,21 +51,22 @@ if __name__ == "__main__":
         print("Transferability")
         qaoa = QAOA(graph = g2)
         
-        print("Energy for the 2nd graph with already optmized params (for the 1st graph):",
-            compute_energy(invert_counts(
+        transferred_energy = Counts.from_qiskit(
             execution(circuit=qaoa.merged_qaoa_circuit(gamma_intercept=solution_array[0],
                                                        gamma_slope=solution_array[1],
                                                        beta_intercept=solution_array[2],
                                                        beta_slope=solution_array[3]),
                                                        backend=backend,
-                                                       shots=shots)),
-                                                       G=g2)
-                                                       )
+                                                       shots=shots)).evaluate(g2, weighted=False)[0]
+        min_energy, _ = ground_truth(g2)
+        print("Energy for the 2nd graph with already optmized params (for the 1st graph):", transferred_energy)
+        print("Approx. ratio:", transferred_energy / min_energy)
         print("")
         start_time_2 = time.time()
         sol_2 = solve(graph=g2, maxiter=1000)
         end_time_2 = time.time()
         print(f"Solution for the 2st graph ({g2.number_of_nodes()} nodes):", sol_2)
+        print("Approx. ratio:", sol_2["fun"] / min_energy)
         print("")
         print("ELAPSED TIME:", np.subtract(end_time_2, start_time_2))
         
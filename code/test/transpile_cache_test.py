@@ -0,0 +1,61 @@
+import numpy as np
+import qiskit_aer as q_aer
+from qiskit import QuantumCircuit
+from qiskit.circuit.library import UnitaryGate
+from utilities import TranspileCache
+
+
+backend = q_aer.Aer.get_backend("qasm_simulator")
+shots = 200
+
+
+def named_subcircuit(angle: float) -> QuantumCircuit:
+    """Two-qubit circuit running a composite instruction "block" built with rx(angle) on qubit 0."""
+    block = QuantumCircuit(2, name="block")
+    block.rx(angle, 0)
+    qc = QuantumCircuit(2)
+    qc.append(block.to_instruction(), [0, 1])
+    qc.measure_all()
+    return qc
+
+
+def unitary_circuit(matrix: np.ndarray) -> QuantumCircuit:
+    qc = QuantumCircuit(1)
+    qc.append(UnitaryGate(matrix), [0])
+    qc.measure_all()
+    return qc
+
+
+def test_named_subcircuits_do_not_collide():
+    cache = TranspileCache()
+    identity = cache.transpile(named_subcircuit(0.0), backend=backend)
+    flipped = cache.transpile(named_subcircuit(np.pi), backend=backend)
+    assert backend.run(identity, shots=shots).result().get_counts() == {"00": shots}
+    assert backend.run(flipped, shots=shots).result().get_counts() == {"01": shots}
+    assert cache.stats()["misses"] == 2
+
+
+def test_unitary_arrays_do_not_collide():
+    cache = TranspileCache()
+    cache.transpile(unitary_circuit(np.eye(2)), backend=backend)
+    flipped = cache.transpile(unitary_circuit(np.array([[0, 1], [1, 0]])), backend=backend)
+    assert backend.run(flipped, shots=shots).result().get_counts() == {"1": shots}
+    assert cache.stats()["misses"] == 2
+
+
+def test_angles_still_share_one_transpilation():
+    cache = TranspileCache()
+    for angle in (0.0, np.pi):
+        qc = QuantumCircuit(1)
+        qc.rx(angle, 0)
+        qc.measure_all()
+        counts = backend.run(cache.transpile(qc, backend=backend), shots=shots).result().get_counts()
+    assert counts == {"1": shots}
+    assert cache.stats()["hits"] == 1
+
+
+if __name__ == "__main__":
+    test_named_subcircuits_do_not_collide()
+    test_unitary_arrays_do_not_collide()
+    test_angles_still_share_one_transpilation()
+    print("TranspileCache regression cases passed")
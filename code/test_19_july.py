@@ -1,7 +1,8 @@
 from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister
 import networkx as nx
 import qiskit_aer as q_aer
-from utilities import execution, invert_counts
+from utilities import execution
+from counts import Counts
 #, get_max_eigenstate
 from maxcut import *
 import numpy as np
@@ -149,7 +150,7 @@ def MultiRun(chosen_seed: int, layers: int) -> dict:
     solution = solve(graph=graph_generated, p=layers, qaoa=qc, start_params=start_params)
     optimal_params_gamma_beta = solution["x"]
     counts = execution(circuit=assign_params(qc=qc, opt_params=optimal_params_gamma_beta), backend=backend, shots=shots)
-    max_eigenstate, max_frequency = get_max_eigenstate(counts=invert_counts(counts=counts))
+    max_eigenstate, max_frequency = get_max_eigenstate(counts=Counts.from_qiskit(counts).to_dict())
     energy = solution["fun"]
     #print("Energy:", solution["fun"])
     #print("Most frequent eigenstate:", max_eigenstate, "with frequency:", max_frequency)
@@ -1,7 +1,12 @@
 from qiskit import transpile
 from qiskit import QuantumCircuit
+from qiskit.circuit import Gate, ParameterVector
+from qiskit.circuit.library import get_standard_gate_name_mapping
+from collections import OrderedDict
+import numpy as np
 from qiskit.visualization import plot_histogram
 from circuit_QAOA import QAOA_circuit
+from counts import Counts
 from matplotlib import pyplot as plt
 
 
@@ -10,17 +15,150 @@ def invert_counts(counts):
     return {k[::-1]:v for k,v in counts.items()}
 
 
+_STANDARD_GATES = {name: type(op) for name, op in get_standard_gate_name_mapping().items() if isinstance(op, Gate)}
+
+
+def _is_standard(op) -> bool:
+    """Library gate whose name fixes its matrix up to its angles, unlike a custom gate of the same name."""
+    return type(op) is _STANDARD_GATES.get(op.name)
+
+
+class TranspileCache:
+    """
+    LRU cache of transpiled circuits keyed by (circuit structure, backend name, optimization level).
+    Numeric gate angles are replaced by parameters before keying, so circuits that only differ in
+    their angles share one transpilation and get the new values bound. Any other instruction is keyed
+    by the exact bytes of its parameters and, for composite instructions, by the same key of its
+    definition, so only circuits that transpile identically can share an entry.
+    """
+    def __init__(self, maxsize: int = 64) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def _exact_param(param) -> tuple:
+        """Key of one parameter that two different values never share (str() summarises arrays)."""
+        if isinstance(param, (int, float, complex, np.number, np.ndarray, list)):
+            array = np.asarray(param)
+            if array.dtype != object:
+                return (array.shape, array.dtype.str, array.tobytes())
+        if isinstance(param, QuantumCircuit):
+            return TranspileCache._exact_structure(param)
+        return (type(param).__name__, str(param))
+
+    @staticmethod
+    def _exact_structure(circuit: QuantumCircuit) -> tuple:
+        """Key of a circuit with every parameter and every nested definition spelled out exactly."""
+        structure = [circuit.num_qubits, circuit.num_clbits, TranspileCache._exact_param(circuit.global_phase)]
+        for instruction in circuit.data:
+            structure.append(TranspileCache._exact_operation(instruction.operation))
+            structure.append((tuple(circuit.find_bit(q).index for q in instruction.qubits),
+                              tuple(circuit.find_bit(c).index for c in instruction.clbits)))
+        return tuple(structure)
+
+    @staticmethod
+    def _exact_operation(op) -> tuple:
+        params = tuple(TranspileCache._exact_param(x) for x in op.params)
+        if _is_standard(op):
+            return (op.name, params)
+        definition = getattr(op, "definition", None)  ### composite: the name says nothing about the contents
+        return (op.name, params, None if definition is None else TranspileCache._exact_structure(definition))
+
+    def _parametrise(self, circuit: QuantumCircuit) -> tuple:
+        """Copy of the circuit with every numeric angle as an element of one ParameterVector, the angles and a structure key."""
+        values, structure, ops = [], [], []
+        for instruction in circuit.data:
+            op = instruction.operation
+            numeric = [isinstance(x, (int, float, np.number)) for x in op.params]
+            if op.params and all(numeric) and _is_standard(op):
+                values.extend(float(x) for x in op.params)
+                structure.append((op.name, len(op.params)))
+            else:
+                structure.append(self._exact_operation(op))
+            ops.append((op, numeric))
+            structure.append((tuple(circuit.find_bit(q).index for q in instruction.qubits),
+                              tuple(circuit.find_bit(c).index for c in instruction.clbits)))
+        angles = ParameterVector("angle", len(values))
+        template, k = circuit.copy_empty_like(), 0
+        for instruction, (op, numeric) in zip(circuit.data, ops):
+            if op.params and all(numeric) and _is_standard(op):
+                op = op.copy()
+                op.params = list(angles[k:k + len(op.params)])
+                k += len(op.params)
+            template.append(op, instruction.qubits, instruction.clbits)
+        return template, angles, values, (circuit.num_qubits, circuit.num_clbits, self._exact_param(circuit.global_phase),
+                                          tuple(structure))
+
+    def transpile(self, circuit: QuantumCircuit, backend, optimization_level: int = None) -> QuantumCircuit:
+        """
+        Transpiled circuit for the backend, from the cache when a circuit of the same structure was seen.
+        :param circuit: (QuantumCircuit) Circuit to run;
+        :param backend: Target backend;
+        :param optimization_level: (int) Transpiler optimization level, None for the qiskit default;
+        :return: (QuantumCircuit) The transpiled circuit with the angles of `circuit` bound.
+        """
+        template, angles, values, structure = self._parametrise(circuit)
+        name = backend.name() if callable(backend.name) else backend.name
+        key = (structure, name, optimization_level)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._entries[key] = (transpile(template, backend=backend, optimization_level=optimization_level), angles)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        transpiled, stored_angles = self._entries[key]
+        if not values:
+            return transpiled
+        return transpiled.assign_parameters(dict(zip(stored_angles, values)))
+
+    def stats(self) -> dict:
+        calls = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / calls if calls else 0.0,
+                "size": len(self._entries)}
+
+
+transpile_cache = TranspileCache()
+
+
 def execution(circuit: QuantumCircuit, backend, shots: int) -> dict:
-    transpil = transpile(circuit, backend=backend)
+    transpil = transpile_cache.transpile(circuit, backend=backend)
     job = backend.run(transpil, shots=shots)
     result = job.result()
     counts = result.get_counts()
     return counts
 
 
+def batch_execution(jobs: list, backend, shots: int, energies: bool = False, max_parallel_experiments: int = 0) -> list:
+    """
+    Run the QAOA circuits of many (graph, params) pairs as one multi-experiment job, with Aer
+    executing the experiments in parallel (max_parallel_experiments=0 uses every core).
+    :param jobs: (list) Pairs (graph, params), params of shape (layers, 2) with rows (gamma, beta);
+    :param backend: Aer backend;
+    :param shots: (int) Shots per circuit;
+    :param energies: (bool) Return the energy of every circuit instead of its counts;
+    :param max_parallel_experiments: (int) Experiments run concurrently by Aer;
+    :return: (list) Counts (qiskit bit order, as execution) or energies, in the order of jobs.
+    """
+    circuits = []
+    for graph, params in jobs:
+        params = np.asarray(params, dtype=float)
+        circuit = QAOA_circuit(graph).merged_qaoa_circuit(gamma=params[:, 0], beta=params[:, 1])
+        circuits.append(transpile_cache.transpile(circuit, backend=backend))
+    job = backend.run(circuits, shots=shots, max_parallel_experiments=max_parallel_experiments)
+    result = job.result()
+    counts = [result.get_counts(k) for k in range(len(circuits))]
+    if not energies:
+        return counts
+    return [Counts.from_qiskit(c).evaluate(graph, weighted=False)[0] for c, (graph, _) in zip(counts, jobs)]
+
+
 def histo_plot(sol) -> plt.show:
     QAOA = QAOA_circuit(graph = G)
     legend = ["Solution"]
-    counts_sol = invert_counts(execution(QAOA.merged_qaoa_circuit(beta=sol[:layers], gamma=sol[layers:]), backend, shots))
+    counts_sol = Counts.from_qiskit(execution(QAOA.merged_qaoa_circuit(beta=sol[:layers], gamma=sol[layers:]), backend, shots)).to_dict()
     plot_histogram(counts_sol, legend=legend)
     return plt.show()
@@ -6,6 +6,9 @@ from qiskit.visualization import plot_histogram
 from scipy.optimize import minimize
 import matplotlib.pyplot as plt
 import time
+from circuit_QAOA import QAOATemplate
+from utilities import batch_execution
+from counts import Counts
 
 
 seed = 999
@@ -89,52 +92,17 @@ circuit_qaoa.draw("mpl", style="iqx")
 plt.show()'''
 
 
-def invert_counts(counts):
-    return {k[::-1]:v for k,v in counts.items()}
-
-
-def Execution(circuit, backend, shots):
-    transpil = transpile(circuit, backend=backend)
-    job = backend.run(transpil, shots=shots)
-    result = job.result()
-    counts = result.get_counts()
-    return invert_counts(counts)
-
-
-def maxcut_obj(x):
-    cut = 0
-    for i,j in edges:
-        if x[i] != x[j]:
-            cut -= 1
-    return cut
-
-
-def compute_energy(counts):
-    E = 0
-    tot_counts = 0
-    for meas, meas_count in counts.items():
-        obj_for_meas = maxcut_obj(meas)
-        E += obj_for_meas * meas_count
-        tot_counts += meas_count
-    return E / tot_counts
-
-
-
 def get_objective(p):
+    template = QAOATemplate(graph=G, layers=p, backend=backend, builder=QAOA)
     def f(theta):
         beta_extracted = theta[:p]
         gamma_extracted = theta[p:]
-        qaoa_circuit = QAOA(beta=beta_extracted, gamma=gamma_extracted)
-        counts = Execution(circuit=qaoa_circuit, backend=backend, shots=1024)
-        return compute_energy(invert_counts(counts=counts))
+        ### the raw Qiskit keys, as the former double invert_counts left them
+        counts = Counts.from_dict(template.run(gamma=gamma_extracted, beta=beta_extracted, shots=1024))
+        return counts.evaluate(G, weighted=False)[0]
     return f
 
 
-def get_most_frequent_state(frequencies):
-    state =  max(frequencies, key=lambda x: frequencies[x])
-    return state
-
-
 '''transpil = transpile(qc, backend=backend)
 best_counts = invert_counts(backend.run(transpil).result().get_counts())
 #plot_histogram(counts)
@@ -150,9 +118,8 @@ param_layers = np.arange(1,10,1)
 
 def transpiling(qc):
     transpil = transpile(qc, backend=backend)
-    best_counts = invert_counts(backend.run(transpil).result().get_counts())
-    maxcut_state = get_most_frequent_state(best_counts)
-    return best_counts, maxcut_state
+    best_counts = Counts.from_qiskit(backend.run(transpil).result().get_counts())
+    return best_counts.to_dict(), best_counts.most_frequent()
 
 
 def multiruns(size):
@@ -162,10 +129,6 @@ def multiruns(size):
     max_cut_state_sol = minimize(obj, starting_params, method="COBYLA", options={"maxiter": 1000, "disp": False})
     optimal_params = max_cut_state_sol["x"]
     energy = max_cut_state_sol["fun"]
-    qaoa_circuit = QAOA(optimal_params[:size], optimal_params[size:])
-    transpil = transpile(qaoa_circuit, backend=backend)
-    best_counts = invert_counts(backend.run(transpil).result().get_counts())
-    maxcut_state = get_most_frequent_state(best_counts)
     stop_time = time.time()
     
     elapsed_time = np.subtract(stop_time, start_time)
@@ -182,6 +145,12 @@ for i in range(len(param_layers)):
     energies.append(res[2])
     initial_params_before_running.append(res[3])
 
+# final counts of every depth as one multi-experiment job instead of one backend.run per depth
+final_counts = batch_execution([(G, np.column_stack([sol[size:], sol[:size]])) for size, sol in zip(param_layers, solution)],
+                               backend=backend, shots=1024)
+maxcut_states = [Counts.from_qiskit(counts).most_frequent() for counts in final_counts]
+print(maxcut_states)
+
 # Extract the first parameter from each solution for plotting
 print(solution)    
 solution_beta = [sol[0] for sol in solution]